@@ -3,8 +3,9 @@ from __future__ import annotations
 import hashlib
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import firestore
 
@@ -132,3 +133,8 @@ def require_placement_cell(user: dict = Depends(get_current_user)) -> dict:
             detail="Placement cell role required.",
         )
     return user
+
+
+def get_io_pool(request: Request) -> ThreadPoolExecutor:
+    """Shared executor for blocking Firestore I/O, created in the app lifespan."""
+    return request.app.state.io_pool
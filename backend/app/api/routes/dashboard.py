@@ -18,7 +18,7 @@ from app.api.routes.search import (
     reset_search_runtime_snapshot,
     trigger_search_warmup,
 )
-from app.utils.serialization import serialize_doc
+from app.utils.serialization import project_snapshot, serialize_doc
 
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
@@ -28,6 +28,10 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 # Pre-computed stats helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Soft-delete filter reads just this field instead of deep-copying each doc.
+_ACTIVE_FIELD = frozenset({"is_active"})
+_QUESTION_COUNT_FIELDS = frozenset({"stats", "extracted_questions"})
+
 # Fields that MUST exist in the cache for it to be considered valid.
 _REQUIRED_CACHE_FIELDS = {
     "total_experiences",
@@ -105,7 +109,7 @@ def _compute_and_cache_stats() -> dict:
     # Filter out soft-deleted contributions
     active_snapshots = [
         s for s in snapshots
-        if (s.to_dict() or {}).get("is_active", True)
+        if project_snapshot(s, _ACTIVE_FIELD).get("is_active", True)
     ]
 
     if not active_snapshots:
@@ -312,6 +316,15 @@ def _build_insights(stats: dict) -> list:
     return insights
 
 
+def _count_questions(snapshots: list) -> int:
+    """Total questions across snapshots; reads each doc once instead of via two ``to_dict()`` copies."""
+    total = 0
+    for snapshot in snapshots:
+        data = project_snapshot(snapshot, _QUESTION_COUNT_FIELDS)
+        total += (data.get("stats") or {}).get("total_question_count", 0) or len(data.get("extracted_questions", []))
+    return total
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # TIER 1: Instant stats (cached/pre-computed)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -332,11 +345,7 @@ def get_dashboard_stats(request: Request, user: dict = Depends(get_current_user)
     )
     
     user_experience_count = len(user_experiences)
-    total_questions = sum(
-        (doc.to_dict().get("stats") or {}).get("total_question_count", 0)
-        or len(doc.to_dict().get("extracted_questions", []))
-        for doc in user_experiences
-    )
+    total_questions = _count_questions(user_experiences)
     
     generated_at = str(stats.get("generated_at") or "")
     freshness_seconds = None
@@ -438,11 +447,7 @@ def get_dashboard(request: Request, user: dict = Depends(get_current_user)) -> d
     )
     
     user_experience_count = len(user_experiences)
-    total_questions = sum(
-        (doc.to_dict().get("stats") or {}).get("total_question_count", 0)
-        or len(doc.to_dict().get("extracted_questions", []))
-        for doc in user_experiences
-    )
+    total_questions = _count_questions(user_experiences)
     
     return {
         "total_experiences": stats.get("total_experiences", 0),
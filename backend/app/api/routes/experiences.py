@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from firebase_admin import firestore
 
-from app.api.dependencies import get_current_user, require_placement_cell
+from app.api.dependencies import get_current_user, get_io_pool, require_placement_cell
 from app.core.firebase import db
 from app.models.schemas import (
     AddQuestionsRequest,
@@ -19,7 +20,7 @@ from app.services.faiss_store import faiss_store
 from app.services.index_queue import search_index_queue
 from app.services.nlp import pipeline
 from app.services.search_core import build_search_terms
-from app.utils.serialization import serialize_doc
+from app.utils.serialization import get_contributor_display, project_snapshot, serialize_doc
 from app.api.routes.dashboard import update_dashboard_stats_async
 
 
@@ -27,6 +28,7 @@ router = APIRouter(prefix="/api/experiences", tags=["experiences"])
 
 # Placeholder for anonymous submissions - preserves real UID for moderation
 ANONYMOUS_DISPLAY_ID = "anonymous"
+_CREATED_AT_FIELD = frozenset({"created_at"})
 
 
 def _require_ownership(experience_id: str, user_uid: str) -> dict:
@@ -212,7 +214,7 @@ def _run_background_nlp(doc_id: str, raw_text: str, user_questions: list[dict])
         )
         full_text = f"{raw_text} {all_question_texts}".strip()
         try:
-            embedding = pipeline.embed(full_text)
+            embedding = pipeline.embed_document(full_text)
             embedding_id = faiss_store.add_vector(embedding, doc_id)
         except Exception:
             embedding_id = None
@@ -251,7 +253,7 @@ def _run_background_nlp(doc_id: str, raw_text: str, user_questions: list[dict])
             }]),
         }
         if embedding_id is not None:
-            update_data["embedding_id"] = embedding_id
+            update_data["embedding_id"] = str(embedding_id)
 
         # ANONYMITY INVARIANT: Background NLP must NEVER overwrite identity fields.
         _IDENTITY_FIELDS = {"is_anonymous", "author", "show_name", "contributor_name", "created_by"}
@@ -300,13 +302,22 @@ def get_my_contributions(user: dict = Depends(get_current_user)) -> dict:
             .stream()
         )
         snapshots.sort(
-            key=lambda s: (s.to_dict() or {}).get("created_at", ""),
+            key=lambda s: project_snapshot(s, _CREATED_AT_FIELD).get("created_at", ""),
             reverse=True,
         )
     results = [serialize_doc(s, include_private=True) for s in snapshots]
     return {"results": results, "total": len(results)}
 
 
+# Everything the moderation queue row and contributor label read; question counts
+# come from the stored stats, so the question lists and edit history stay on the server.
+_ADMIN_QUEUE_FIELDS = frozenset({
+    "nlp_status", "is_active", "company", "role", "year", "round", "difficulty",
+    "created_at", "created_by", "raw_text", "stats",
+    "is_anonymous", "author", "show_name", "contributor_name", "contributor_display",
+})
+
+
 @router.get("/admin/queue")
 def get_admin_moderation_queue(
     status_filter: str = Query(
@@ -323,13 +334,14 @@ def get_admin_moderation_queue(
 
     snapshots = list(
         db.collection("interview_experiences")
+        .select(sorted(_ADMIN_QUEUE_FIELDS))
         .limit(500)
         .stream()
     )
 
     queue_rows = []
     for snapshot in snapshots:
-        data = snapshot.to_dict() or {}
+        data = project_snapshot(snapshot, _ADMIN_QUEUE_FIELDS)
         doc_nlp_status = str(data.get("nlp_status") or "unknown").lower()
         is_active = bool(data.get("is_active", True))
 
@@ -340,27 +352,29 @@ def get_admin_moderation_queue(
         if filters.active == "hidden" and is_active:
             continue
 
-        serialized = serialize_doc(snapshot, include_private=True, include_contributor=True)
-        created_at_raw = serialized.get("created_at")
+        # The row needs no full serialization: only created_at may be a datetime.
+        created_at_raw = data.get("created_at")
         created_at_dt = _coerce_datetime(created_at_raw)
-        stats = serialized.get("stats") or {}
+        if isinstance(created_at_raw, datetime):
+            created_at_raw = created_at_raw.isoformat()
+        stats = data.get("stats") or {}
 
         queue_rows.append(
             {
                 "id": snapshot.id,
-                "company": serialized.get("company", ""),
-                "role": serialized.get("role", ""),
-                "year": serialized.get("year"),
-                "round": serialized.get("round", ""),
-                "difficulty": serialized.get("difficulty", ""),
+                "company": data.get("company", ""),
+                "role": data.get("role", ""),
+                "year": data.get("year"),
+                "round": data.get("round", ""),
+                "difficulty": data.get("difficulty", ""),
                 "is_active": is_active,
                 "nlp_status": doc_nlp_status,
                 "created_at": created_at_raw,
-                "created_by": serialized.get("created_by"),
-                "contributor_display": serialized.get("contributor_display", "Anonymous"),
+                "created_by": data.get("created_by"),
+                "contributor_display": data.get("contributor_display") or get_contributor_display(data),
                 "question_count": int(stats.get("total_question_count") or 0),
                 "user_question_count": int(stats.get("user_question_count") or 0),
-                "raw_text_preview": str(serialized.get("raw_text") or "")[:220],
+                "raw_text_preview": str(data.get("raw_text") or "")[:220],
                 "_sort_ts": created_at_dt.timestamp() if created_at_dt else 0,
             }
         )
@@ -440,6 +454,7 @@ def admin_update_experience_visibility(
     experience_id: str,
     payload: AdminVisibilityUpdate,
     user: dict = Depends(require_placement_cell),
+    io_pool: ThreadPoolExecutor = Depends(get_io_pool),
 ) -> dict:
     """Placement-cell moderation control to hide or re-activate an experience."""
     snapshot = db.collection("interview_experiences").document(experience_id).get()
@@ -471,7 +486,7 @@ def admin_update_experience_visibility(
         }
     )
     search_index_queue.enqueue_upsert(experience_id)
-    threading.Thread(target=update_dashboard_stats_async, daemon=True).start()
+    io_pool.submit(update_dashboard_stats_async)
 
     return {
         "status": new_value,
@@ -602,6 +617,8 @@ def create_experience(payload: ExperienceCreate, user: dict = Depends(get_curren
             "new_value": f"Experience submitted with {len(user_question_objects)} user-provided question(s)",
         }],
     }
+    # Identity fields are immutable after submission, so the public label is too.
+    doc_data["contributor_display"] = get_contributor_display(doc_data)
 
     doc_ref.set(doc_data)
     search_index_queue.enqueue_upsert(doc_ref.id)
@@ -640,7 +657,11 @@ def get_experience(experience_id: str) -> dict:
 # ─────────────────────────────────────────────────────────────────────────────
 
 @router.delete("/{experience_id}")
-def soft_delete_experience(experience_id: str, user: dict = Depends(get_current_user)) -> dict:
+def soft_delete_experience(
+    experience_id: str,
+    user: dict = Depends(get_current_user),
+    io_pool: ThreadPoolExecutor = Depends(get_io_pool),
+) -> dict:
     """Soft-delete: hides from search & analytics but preserves data."""
     _require_ownership(experience_id, user["uid"])
     now = datetime.now(timezone.utc).isoformat()
@@ -655,12 +676,16 @@ def soft_delete_experience(experience_id: str, user: dict = Depends(get_current_
         }]),
     })
     search_index_queue.enqueue_upsert(experience_id)
-    threading.Thread(target=update_dashboard_stats_async, daemon=True).start()
+    io_pool.submit(update_dashboard_stats_async)
     return {"status": "hidden", "experience_id": experience_id}
 
 
 @router.post("/{experience_id}/restore")
-def restore_experience(experience_id: str, user: dict = Depends(get_current_user)) -> dict:
+def restore_experience(
+    experience_id: str,
+    user: dict = Depends(get_current_user),
+    io_pool: ThreadPoolExecutor = Depends(get_io_pool),
+) -> dict:
     """Restore a soft-deleted contribution back to active."""
     _require_ownership(experience_id, user["uid"])
     now = datetime.now(timezone.utc).isoformat()
@@ -675,7 +700,7 @@ def restore_experience(experience_id: str, user: dict = Depends(get_current_user
         }]),
     })
     search_index_queue.enqueue_upsert(experience_id)
-    threading.Thread(target=update_dashboard_stats_async, daemon=True).start()
+    io_pool.submit(update_dashboard_stats_async)
     return {"status": "active", "experience_id": experience_id}
 
 
@@ -686,7 +711,7 @@ def restore_experience(experience_id: str, user: dict = Depends(get_current_user
 # Immutable fields — these must NEVER be accepted in a metadata update.
 _IMMUTABLE_FIELDS = frozenset({
     "raw_text", "summary", "extracted_questions", "questions", "topics",
-    "created_by", "created_at", "embedding_id", "edit_history", "stats",
+    "created_by", "created_at", "embedding_id", "edit_history", "stats", "contributor_display",
 })
 
 
@@ -695,6 +720,7 @@ def update_experience_metadata(
     experience_id: str,
     payload: ExperienceMetadataUpdate,
     user: dict = Depends(get_current_user),
+    io_pool: ThreadPoolExecutor = Depends(get_io_pool),
 ) -> dict:
     """Update allowed metadata fields with edit history tracking.
 
@@ -754,7 +780,7 @@ def update_experience_metadata(
     updates["edit_history"] = firestore.ArrayUnion(history_entries)
     db.collection("interview_experiences").document(experience_id).update(updates)
     search_index_queue.enqueue_upsert(experience_id)
-    threading.Thread(target=update_dashboard_stats_async, daemon=True).start()
+    io_pool.submit(update_dashboard_stats_async)
 
     result = serialize_doc(
         db.collection("interview_experiences").document(experience_id).get(),
@@ -947,7 +973,7 @@ def _run_background_question_enrichment(doc_id: str) -> None:
         )
         full_text = f"{raw_text} {all_question_texts}".strip()
         try:
-            new_embedding = pipeline.embed(full_text)
+            new_embedding = pipeline.embed_document(full_text)
             faiss_store.add_vector(new_embedding, doc_id)
         except Exception:
             pass  # Non-critical: existing embedding still serves
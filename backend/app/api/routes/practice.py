@@ -1,5 +1,6 @@
 """Practice Lists API routes."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import List
 
@@ -71,17 +72,17 @@ def _recompute_and_store_list_stats(list_id: str) -> dict:
     return stats
 
 
-def repair_all_practice_list_stats() -> int:
+def repair_all_practice_list_stats(io_pool: ThreadPoolExecutor) -> int:
     """Reconciliation: scan ALL practice_lists and recompute counters.
 
     Called on backend startup to fix any stale data left by older code paths
-    or interrupted writes.  Returns the number of lists repaired.
+    or interrupted writes.  Lists are independent, so their read + write
+    round-trips overlap on the shared I/O pool.  Returns the number of lists repaired.
     """
-    repaired = 0
-    for list_doc in db.collection("practice_lists").stream():
-        _recompute_and_store_list_stats(list_doc.id)
-        repaired += 1
-    return repaired
+    list_ids = [list_doc.id for list_doc in db.collection("practice_lists").select([]).stream()]
+    for _ in io_pool.map(_recompute_and_store_list_stats, list_ids):
+        pass  # drain so a failed recompute raises here
+    return len(list_ids)
 
 
 def _read_list_response(doc_id: str, data: dict) -> PracticeListResponse:
@@ -1,23 +1,27 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from firebase_admin import firestore
 
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, get_io_pool
 from app.core.firebase import db
 from app.models.schemas import NameUpdate, UserCreate
-from app.utils.serialization import serialize_doc
-
-_profile_pool = ThreadPoolExecutor(max_workers=3)
-
+from app.utils.serialization import serialize_data, serialize_doc
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 # Name changes are limited to once every 30 days
 _NAME_COOLDOWN_DAYS = 30
+# Unparseable timestamps are treated as "long enough ago" to allow a change.
+_FALLBACK_DELTA = timedelta(days=_NAME_COOLDOWN_DAYS + 1)
+# Fields the /me response is built from (UserProfile on the frontend). Reading
+# with a field mask keeps user-doc fetches small as the document grows.
+_PROFILE_FIELDS = ["uid", "name", "display_name", "email", "role", "created_at", "name_last_updated_at"]
 _ROLE_PRIORITY = {
     "viewer": 0,
     "contributor": 1,
@@ -43,6 +47,23 @@ def _derive_display_name(full_name: str) -> str:
     return ""
 
 
+def _coerce_aware_dt(value: Any, fallback: datetime) -> datetime:
+    """Parse a stored timestamp into a tz-aware datetime (naive values are UTC)."""
+    match value:
+        case datetime():
+            parsed = value
+        case str():
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                return fallback
+        case _:
+            return fallback
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
 def _enrich_user_response(data: dict) -> dict:
     """Add computed fields for the frontend: can_edit_name, next_name_edit_date, display_name."""
     now = datetime.now(timezone.utc)
@@ -54,20 +75,7 @@ def _enrich_user_response(data: dict) -> dict:
     # Compute cooldown status
     last_updated = data.get("name_last_updated_at")
     if last_updated:
-        if isinstance(last_updated, str):
-            try:
-                last_dt = datetime.fromisoformat(last_updated)
-            except (ValueError, TypeError):
-                last_dt = now - timedelta(days=_NAME_COOLDOWN_DAYS + 1)
-        elif isinstance(last_updated, datetime):
-            last_dt = last_updated
-        else:
-            last_dt = now - timedelta(days=_NAME_COOLDOWN_DAYS + 1)
-
-        # Ensure timezone-aware comparison
-        if last_dt.tzinfo is None:
-            last_dt = last_dt.replace(tzinfo=timezone.utc)
-
+        last_dt = _coerce_aware_dt(last_updated, now - _FALLBACK_DELTA)
         next_eligible = last_dt + timedelta(days=_NAME_COOLDOWN_DAYS)
         data["can_edit_name"] = now >= next_eligible
         data["next_name_edit_date"] = next_eligible.isoformat() if now < next_eligible else None
@@ -81,7 +89,7 @@ def _enrich_user_response(data: dict) -> dict:
 
 @router.get("/me")
 def get_me(user: dict = Depends(get_current_user)) -> dict:
-    snapshot = db.collection("users").document(user["uid"]).get()
+    snapshot = db.collection("users").document(user["uid"]).get(field_paths=_PROFILE_FIELDS)
     if snapshot.exists:
         result = serialize_doc(snapshot)
         return _enrich_user_response(result)
@@ -89,7 +97,10 @@ def get_me(user: dict = Depends(get_current_user)) -> dict:
 
 
 @router.get("/profile")
-def get_profile(user: dict = Depends(get_current_user)) -> dict:
+async def get_profile(
+    user: dict = Depends(get_current_user),
+    io_pool: ThreadPoolExecutor = Depends(get_io_pool),
+) -> dict:
     """Aggregated user profile with contribution stats, practice activity, and privacy summary."""
     uid = user["uid"]
 
@@ -97,12 +108,55 @@ def get_profile(user: dict = Depends(get_current_user)) -> dict:
     def _fetch_user():
         return db.collection("users").document(uid).get()
 
-    def _fetch_experiences():
-        return list(
+    def _summarize_experiences():
+        # Aggregate while streaming — experience docs carry large raw_text
+        # bodies, so never hold the whole result set in memory.
+        total_experiences = 0
+        active_count = 0
+        hidden_count = 0
+        total_questions_extracted = 0
+        questions_added_later = 0
+        anonymous_count = 0
+        companies: set[str] = set()
+        topics_set: set[str] = set()
+
+        for snap in (
             db.collection("interview_experiences")
             .where(filter=firestore.FieldFilter("created_by", "==", uid))
             .stream()
-        )
+        ):
+            data = snap.to_dict() or {}
+            total_experiences += 1
+            is_active = data.get("is_active", True)
+            if is_active:
+                active_count += 1
+            else:
+                hidden_count += 1
+            if data.get("is_anonymous", False):
+                anonymous_count += 1
+
+            questions = data.get("extracted_questions") or []
+            total_questions_extracted += len(questions)
+            for q in questions:
+                if isinstance(q, dict) and q.get("added_later"):
+                    questions_added_later += 1
+
+            company = data.get("company")
+            if company:
+                companies.add(company)
+            for t in (data.get("topics") or []):
+                topics_set.add(t)
+
+        return {
+            "total_experiences": total_experiences,
+            "active": active_count,
+            "hidden": hidden_count,
+            "questions_extracted": total_questions_extracted,
+            "questions_added_later": questions_added_later,
+            "anonymous_contributions": anonymous_count,
+            "companies_covered": sorted(companies),
+            "topics_covered": sorted(topics_set),
+        }
 
     def _fetch_practice_lists():
         return list(
@@ -111,65 +165,16 @@ def get_profile(user: dict = Depends(get_current_user)) -> dict:
             .stream()
         )
 
-    futures = {
-        _profile_pool.submit(_fetch_user): "user",
-        _profile_pool.submit(_fetch_experiences): "experiences",
-        _profile_pool.submit(_fetch_practice_lists): "lists",
-    }
-
-    results: dict = {}
-    for future in as_completed(futures):
-        results[futures[future]] = future.result()
-
-    user_snapshot = results["user"]
-    experience_snapshots = results["experiences"]
-    list_snapshots_raw = results["lists"]
+    loop = asyncio.get_running_loop()
+    user_snapshot, contribution_summary, list_snapshots_raw = await asyncio.gather(
+        loop.run_in_executor(io_pool, _fetch_user),
+        loop.run_in_executor(io_pool, _summarize_experiences),
+        loop.run_in_executor(io_pool, _fetch_practice_lists),
+    )
 
     identity = serialize_doc(user_snapshot) if user_snapshot.exists else user
     identity = _enrich_user_response(identity)
 
-    total_experiences = len(experience_snapshots)
-    active_count = 0
-    hidden_count = 0
-    total_questions_extracted = 0
-    questions_added_later = 0
-    anonymous_count = 0
-    companies: set[str] = set()
-    topics_set: set[str] = set()
-
-    for snap in experience_snapshots:
-        data = snap.to_dict() or {}
-        is_active = data.get("is_active", True)
-        if is_active:
-            active_count += 1
-        else:
-            hidden_count += 1
-        if data.get("is_anonymous", False):
-            anonymous_count += 1
-
-        questions = data.get("extracted_questions") or []
-        total_questions_extracted += len(questions)
-        for q in questions:
-            if isinstance(q, dict) and q.get("added_later"):
-                questions_added_later += 1
-
-        company = data.get("company")
-        if company:
-            companies.add(company)
-        for t in (data.get("topics") or []):
-            topics_set.add(t)
-
-    contribution_summary = {
-        "total_experiences": total_experiences,
-        "active": active_count,
-        "hidden": hidden_count,
-        "questions_extracted": total_questions_extracted,
-        "questions_added_later": questions_added_later,
-        "anonymous_contributions": anonymous_count,
-        "companies_covered": sorted(companies),
-        "topics_covered": sorted(topics_set),
-    }
-
     # ── Practice activity (already fetched in parallel) ─────────────────
     list_snapshots = list_snapshots_raw
 
@@ -213,50 +218,45 @@ def update_display_name(
     - Does NOT retroactively update past contributions (they are immutable snapshots).
     """
     doc_ref = db.collection("users").document(user["uid"])
-    snapshot = doc_ref.get()
-
-    if not snapshot.exists:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User profile not found.",
-        )
+    transaction = db.transaction()
 
-    data = snapshot.to_dict() or {}
-    now = datetime.now(timezone.utc)
+    # Read, cooldown check, and write run in one transaction so two concurrent
+    # renames cannot both pass the check.
+    @firestore.transactional
+    def _rename(txn) -> dict:
+        snapshot = doc_ref.get(field_paths=_PROFILE_FIELDS, transaction=txn)
 
-    # Check 30-day cooldown
-    last_updated = data.get("name_last_updated_at")
-    if last_updated:
-        if isinstance(last_updated, str):
-            try:
-                last_dt = datetime.fromisoformat(last_updated)
-            except (ValueError, TypeError):
-                last_dt = now - timedelta(days=_NAME_COOLDOWN_DAYS + 1)
-        elif isinstance(last_updated, datetime):
-            last_dt = last_updated
-        else:
-            last_dt = now - timedelta(days=_NAME_COOLDOWN_DAYS + 1)
-
-        if last_dt.tzinfo is None:
-            last_dt = last_dt.replace(tzinfo=timezone.utc)
-
-        next_eligible = last_dt + timedelta(days=_NAME_COOLDOWN_DAYS)
-        if now < next_eligible:
+        if not snapshot.exists:
             raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Name changes are limited to once every {_NAME_COOLDOWN_DAYS} days. "
-                       f"Next eligible: {next_eligible.strftime('%B %d, %Y')}.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User profile not found.",
             )
 
-    new_display = _derive_display_name(payload.name)
-
-    doc_ref.update({
-        "name": payload.name,
-        "display_name": new_display,
-        "name_last_updated_at": now.isoformat(),
-    })
-
-    result = serialize_doc(doc_ref.get())
+        data = snapshot.to_dict() or {}
+        now = datetime.now(timezone.utc)
+
+        # Check 30-day cooldown
+        last_updated = data.get("name_last_updated_at")
+        if last_updated:
+            last_dt = _coerce_aware_dt(last_updated, now - _FALLBACK_DELTA)
+            next_eligible = last_dt + timedelta(days=_NAME_COOLDOWN_DAYS)
+            if now < next_eligible:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Name changes are limited to once every {_NAME_COOLDOWN_DAYS} days. "
+                           f"Next eligible: {next_eligible.strftime('%B %d, %Y')}.",
+                )
+
+        updated_fields = {
+            "name": payload.name,
+            "display_name": _derive_display_name(payload.name),
+            "name_last_updated_at": now.isoformat(),
+        }
+        txn.update(doc_ref, updated_fields)
+        return data | updated_fields
+
+    # We already know what was written — no need to re-read the document.
+    result = serialize_data(_rename(transaction), doc_ref.id)
     return _enrich_user_response(result)
 
 
@@ -24,6 +24,11 @@ class Settings(BaseSettings):
 
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_DIM: int = 384
+    EMBEDDING_QUANTIZE: bool = True
+    MODELS_DIR: Optional[str] = None
+    EMBED_CACHE_ENABLED: bool = True
+    EMBED_CACHE_PATH: Optional[str] = None
+    EMBED_CACHE_MAX_AGE_DAYS: int = 30
 
     MAX_SEARCH_RESULTS: int = 20
     DASHBOARD_SAMPLE_LIMIT: int = 500
@@ -72,6 +77,8 @@ class Settings(BaseSettings):
     FAISS_DIR: Optional[str] = None
     FAISS_INDEX_PATH: Optional[str] = None
     FAISS_MAPPING_PATH: Optional[str] = None
+    FAISS_SCALAR_QUANTIZE: bool = True
+    FAISS_REQUIRE_SIMD: bool = False
 
     PLACEMENT_CELL_EMAILS: str = ""
 
@@ -121,6 +128,16 @@ class Settings(BaseSettings):
             path = BASE_DIR / path
         return path
 
+    @property
+    def models_dir_path(self) -> Path:
+        fallback = BASE_DIR / "data" / "models"
+        return self._resolve_path(self.MODELS_DIR, fallback)
+
+    @property
+    def embed_cache_path(self) -> Path:
+        fallback = BASE_DIR / "data" / "embed_cache.db"
+        return self._resolve_path(self.EMBED_CACHE_PATH, fallback)
+
     @property
     def faiss_dir_path(self) -> Path:
         fallback = BASE_DIR / "data" / "faiss"
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
@@ -29,6 +30,9 @@ logging.basicConfig(
 logger = logging.getLogger("hirelog")
 _mutation_limiter = SlidingWindowLimiter(settings.MUTATION_RATE_LIMIT_PER_MINUTE, 60)
 _WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Firestore calls are I/O-bound and the SDK serializes internally, so size the
+# shared pool well above the CPU count.
+_IO_POOL_WORKERS = 32
 
 
 @asynccontextmanager
@@ -38,6 +42,11 @@ async def lifespan(app: FastAPI):
     # ALL heavy work runs in background threads so the port binds immediately.
     import threading
 
+    app.state.io_pool = ThreadPoolExecutor(
+        max_workers=_IO_POOL_WORKERS,
+        thread_name_prefix="firestore-io",
+    )
+
     def _bg_bootstrap():
         try:
             db.collection("metadata").document("bootstrap").set(
@@ -64,7 +73,7 @@ async def lifespan(app: FastAPI):
 
     def _bg_repair():
         try:
-            repaired = repair_all_practice_list_stats()
+            repaired = repair_all_practice_list_stats(app.state.io_pool)
             logger.info("Practice list stats reconciled: %d list(s)", repaired)
         except Exception:
             logger.exception("Practice list stats repair failed")
@@ -90,7 +99,7 @@ async def lifespan(app: FastAPI):
 
     threading.Thread(target=_bg_bootstrap, daemon=True).start()
     threading.Thread(target=_bg_seed, daemon=True).start()
-    threading.Thread(target=_bg_dashboard, daemon=True).start()
+    app.state.io_pool.submit(_bg_dashboard)
     threading.Thread(target=_bg_repair, daemon=True).start()
     threading.Thread(target=_bg_search_warmup, daemon=True).start()
     threading.Thread(target=_bg_search_index_bootstrap, daemon=True).start()
@@ -100,6 +109,7 @@ async def lifespan(app: FastAPI):
     yield
     # ── Shutdown ─────────────────────────────────────────────────────────────
     logger.info("Shutting down gracefully")
+    app.state.io_pool.shutdown(wait=False, cancel_futures=True)
 
 
 app = FastAPI(title=settings.API_TITLE, lifespan=lifespan)
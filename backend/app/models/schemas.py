@@ -152,7 +152,8 @@ class ExperienceResponse(BaseModel):
     topics: List[str] = []
     summary: str = ""
     stats: Optional[QuestionStats] = None
-    embedding_id: Optional[int] = None
+    # A 64-bit FAISS id; a string so JavaScript clients do not round it past 2**53.
+    embedding_id: Optional[str] = None
     created_by: str
     created_at: Optional[str] = None
     score: Optional[float] = None
@@ -167,6 +168,11 @@ class ExperienceResponse(BaseModel):
     contact_linkedin: Optional[str] = None
     contact_email: Optional[str] = None
 
+    @field_validator("embedding_id", mode="before")
+    @classmethod
+    def _stringify_embedding_id(cls, value: object) -> object:
+        return str(value) if isinstance(value, int) else value
+
 
 class SearchResponse(BaseModel):
     results: List[ExperienceResponse]
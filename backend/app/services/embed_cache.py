@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MEMORY_MAX_ENTRIES = 4096
+# Stay under SQLite's bound-parameter limit on older builds.
+_SQL_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """Content-hashed embedding cache: in-process LRU in front of a SQLite file.
+
+    Keys cover the model and the backend that actually loaded it (see
+    ``set_backend``), so vectors from an int8 export and its fp32 fallback never
+    mix. Until a backend is set every lookup misses and nothing is stored.
+    Returned arrays are read-only because they are shared.
+    """
+
+    def __init__(self) -> None:
+        self._namespace: str | None = None
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_opened = False
+
+    def set_backend(self, backend: str) -> None:
+        """Scope keys to ``backend`` (e.g. "int8", "onnx", "torch"), once the model has loaded."""
+        with self._lock:
+            self._namespace = f"{settings.EMBEDDING_MODEL}|{backend}\0"
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b((self._namespace + text).encode("utf-8"), digest_size=16).digest()
+
+    def _connection(self) -> sqlite3.Connection | None:
+        """Open the disk store on first use; the cache degrades to memory-only on failure."""
+        if self._db_opened:
+            return self._db
+        self._db_opened = True
+        if not settings.EMBED_CACHE_ENABLED:
+            return None
+        path = settings.embed_cache_path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "hash BLOB PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            cutoff = time.time() - settings.EMBED_CACHE_MAX_AGE_DAYS * 86400
+            purged = db.execute("DELETE FROM embeddings WHERE created_at < ?", (cutoff,)).rowcount
+            db.commit()
+            if purged:
+                logger.info("Embedding cache purged %d stale entries", purged)
+            self._db = db
+        except sqlite3.Error:
+            logger.exception("Embedding cache unavailable at %s; using memory only", path)
+        return self._db
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > _MEMORY_MAX_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: Sequence[str]) -> List[np.ndarray | None]:
+        results: List[np.ndarray | None] = [None] * len(texts)
+        with self._lock:
+            if self._namespace is None:
+                return results
+            keys = [self._key(text) for text in texts]
+            missing: dict[bytes, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            db = self._connection()
+            rows = []
+            if missing and db is not None:
+                pending = list(missing)
+                try:
+                    for start in range(0, len(pending), _SQL_BATCH_SIZE):
+                        chunk = pending[start:start + _SQL_BATCH_SIZE]
+                        rows.extend(db.execute(
+                            f"SELECT hash, dim, vec FROM embeddings WHERE hash IN ({','.join('?' * len(chunk))})",
+                            chunk,
+                        ).fetchall())
+                except sqlite3.Error:
+                    logger.exception("Embedding cache read failed")
+                for key, dim, blob in rows:
+                    vector = np.frombuffer(blob, dtype="float32")
+                    if vector.shape[0] != dim:
+                        continue
+                    self._remember(key, vector)
+                    for i in missing[key]:
+                        results[i] = vector
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        rows = []
+        now = time.time()
+        with self._lock:
+            if self._namespace is None:
+                return
+            for text, vector in zip(texts, vectors):
+                key = self._key(text)
+                frozen = np.array(vector, dtype="float32")
+                frozen.flags.writeable = False
+                self._remember(key, frozen)
+                rows.append((key, frozen.shape[0], frozen.tobytes(), now))
+
+            db = self._connection()
+            if db is None or not rows:
+                return
+            try:
+                db.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                db.commit()
+            except sqlite3.Error:
+                logger.exception("Embedding cache write failed")
+
+
+embed_cache = EmbeddingCache()
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import mmap
+import os
+import struct
 import threading
-from typing import List, Tuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
 
 import numpy as np
 
@@ -12,6 +18,11 @@ try:
 except Exception:  # pragma: no cover - exercised only when FAISS native bindings are unavailable
     faiss = None
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -19,6 +30,53 @@ logger = logging.getLogger(__name__)
 _INDEX_PATH = settings.faiss_index_path
 _MAPPING_PATH = settings.faiss_mapping_path
 
+# Above this many vectors a flat scan is replaced by an HNSW graph (sub-linear search).
+_HNSW_THRESHOLD = 4_096
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH = 64
+# int8 scalar quantisation needs enough vectors to learn per-dimension ranges.
+_SQ_MIN_TRAIN = 1_000
+
+# Per-thread scratch row for query vectors, reused across searches.
+_query_buffers = threading.local()
+
+# Compile-option tokens meaning the inner-product kernels are vectorised.
+_SIMD_FLAGS = ("AVX2", "AVX512", "NEON", "SVE")
+
+# mapping.bin record header: stable id (int64) + UTF-8 doc_id byte length (uint16).
+_JOURNAL_HEADER = struct.Struct("<qH")
+
+
+def _stable_id(doc_id: str) -> int:
+    """64-bit FAISS id derived from the doc_id, identical across processes and rebuilds."""
+    digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _dumps(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _loads(raw: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _check_simd_build() -> None:
+    """Log which SIMD kernels the loaded FAISS build uses; a scalar build is 3-5x slower."""
+    options = faiss.get_compile_options()
+    logger.info("FAISS %s compile options: %s", faiss.__version__, options.strip() or "<none>")
+    if any(flag in options.split() for flag in _SIMD_FLAGS):
+        return
+    message = "FAISS build has no AVX2/AVX-512/NEON kernels; similarity search runs on scalar code"
+    if settings.FAISS_REQUIRE_SIMD:
+        raise RuntimeError(message)
+    logger.warning(message)
+
 
 def _normalize_l2(matrix: np.ndarray) -> np.ndarray:
     norms = np.linalg.norm(matrix, axis=1, keepdims=True)
@@ -26,24 +84,103 @@ def _normalize_l2(matrix: np.ndarray) -> np.ndarray:
     return matrix / norms
 
 
+def _normalize_l2_inplace(matrix: np.ndarray) -> None:
+    if faiss is not None:
+        faiss.normalize_L2(matrix)
+        return
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    matrix /= norms
+
+
+def _write_atomic(path: Path, write: Callable[[str], None]) -> None:
+    """Write via a sibling temp file + os.replace so readers never see a torn file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(str(tmp_path))
+    os.replace(tmp_path, path)
+
+
+def _query_buffer(dimension: int) -> np.ndarray:
+    buffer = getattr(_query_buffers, "query", None)
+    if buffer is None or buffer.shape[1] != dimension:
+        buffer = np.empty((1, dimension), dtype="float32")
+        _query_buffers.query = buffer
+    return buffer
+
+
+class _ReadWriteLock:
+    """Many concurrent readers, one exclusive writer; waiting writers block new readers."""
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
 class _NumpyIndexFlatIP:
-    """Small fallback index used when FAISS native bindings are unavailable."""
+    """Small fallback index used when FAISS native bindings are unavailable.
+
+    Tracks its own ids, so it stands in for ``IndexIDMap2(IndexFlatIP)``.
+    """
 
     def __init__(self, dimension: int) -> None:
         self.dimension = int(dimension)
         self._vectors = np.empty((0, self.dimension), dtype="float32")
+        self._ids = np.empty(0, dtype="int64")
 
     @property
     def ntotal(self) -> int:
         return int(self._vectors.shape[0])
 
     def add(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype="float32").reshape(-1, self.dimension)
+        self.add_with_ids(vectors, np.arange(self.ntotal, self.ntotal + vectors.shape[0], dtype="int64"))
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
         vectors = np.asarray(vectors, dtype="float32")
         if vectors.ndim == 1:
             vectors = vectors.reshape(1, -1)
         if vectors.size == 0:
             return
         self._vectors = np.vstack([self._vectors, vectors])
+        self._ids = np.concatenate([self._ids, np.asarray(ids, dtype="int64")])
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        keep = ~np.isin(self._ids, ids)
+        removed = int(self._ids.shape[0] - keep.sum())
+        self._vectors = self._vectors[keep]
+        self._ids = self._ids[keep]
+        return removed
 
     def search(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
         query = np.asarray(query, dtype="float32")
@@ -59,7 +196,7 @@ class _NumpyIndexFlatIP:
         top_k = max(1, min(int(k), self.ntotal))
         top_indices = np.argsort(-scores)[:top_k]
         top_scores = scores[top_indices]
-        return top_scores.reshape(1, -1).astype("float32"), top_indices.reshape(1, -1).astype("int64")
+        return top_scores.reshape(1, -1).astype("float32"), self._ids[top_indices].reshape(1, -1)
 
 
 class FaissStore:
@@ -67,111 +204,309 @@ class FaissStore:
         self.index_path = _INDEX_PATH
         self.mapping_path = _MAPPING_PATH
         self.dimension = dimension
-        self._lock = threading.Lock()
-        self._index: faiss.IndexFlatIP | None = None
-        self._mapping: List[str] | None = None
+        # FAISS searches are safe to run concurrently; only add/rebuild need exclusivity.
+        self._lock = _ReadWriteLock()
+        self._index: faiss.IndexIDMap2 | None = None
+        # Stable FAISS id -> Firestore doc_id.
+        self._mapping: Dict[int, str] | None = None
+        # Inside bulk() inserts only touch memory; one flush persists them at the end.
+        self._bulk_depth = 0
+        self._dirty = False
+        # Set when a re-embed could not remove the old vector (HNSW has no deletion).
+        self._has_duplicates = False
+
+    @property
+    def journal_path(self) -> Path:
+        """Append-only log of inserts made since mapping.json was last written."""
+        return self.mapping_path.with_suffix(".bin")
 
     def _ensure_loaded(self) -> None:
-        """Lazy-load FAISS index on first use."""
-        if self._index is None:
-            self._index = self._load_or_create_index()
-            self._mapping = self._load_or_create_mapping()
+        """Lazy-load FAISS index on first use.
+
+        Loading (and any legacy migration, which rewrites files through fixed
+        temp names) runs under the write lock, so concurrent first callers load
+        once. Call before taking the lock yourself: it is not re-entrant.
+        """
+        if self._index is not None:
+            return
+        with self._lock.write():
+            if self._index is not None:
+                return
+            index = self._load_or_create_index()
+            mapping, legacy_mapping = self._load_or_create_mapping()
+            if legacy_mapping is not None:
+                index, mapping = self._migrate_positional(index, legacy_mapping)
+            # _index is the "loaded" flag checked without the lock, so publish it last.
+            self._mapping = mapping
+            self._index = index
+            if legacy_mapping is not None:
+                self._persist_index()
+                self._persist_mapping(mapping)
             logger.info(
                 "FAISS store initialised — index=%s  vectors=%d",
                 self.index_path,
-                self._index.ntotal,
+                index.ntotal,
             )
 
     @property
-    def index(self) -> faiss.IndexFlatIP:
+    def index(self) -> faiss.IndexIDMap2:
         self._ensure_loaded()
         return self._index  # type: ignore
 
     @index.setter
-    def index(self, value: faiss.IndexFlatIP) -> None:
+    def index(self, value: faiss.IndexIDMap2) -> None:
         self._index = value
 
     @property
-    def mapping(self) -> List[str]:
+    def mapping(self) -> Dict[int, str]:
         self._ensure_loaded()
         return self._mapping  # type: ignore
 
     @mapping.setter
-    def mapping(self, value: List[str]) -> None:
+    def mapping(self, value: Dict[int, str]) -> None:
         self._mapping = value
 
-    def _load_or_create_index(self) -> faiss.IndexFlatIP:
+    def _wrap_ids(self, index):
+        """Let FAISS own the id -> vector association so inserts never renumber rows."""
+        if faiss is None:
+            return index  # the numpy fallback tracks ids itself
+        return faiss.IndexIDMap2(index)
+
+    def _load_or_create_index(self) -> faiss.IndexIDMap2:
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
         if faiss is None:
             logger.warning("FAISS not available; using numpy similarity fallback index")
             return _NumpyIndexFlatIP(self.dimension)
 
+        _check_simd_build()
         if self.index_path.exists():
             return faiss.read_index(str(self.index_path))
 
         # FAISS is purpose-built for semantic vector search, which is expensive in pure Python.
         # It stays fast by using optimized native (C++/SIMD) routines for similarity computation.
-        index = faiss.IndexFlatIP(self.dimension)
-        faiss.write_index(index, str(self.index_path))
+        index = self._wrap_ids(faiss.IndexFlatIP(self.dimension))
+        _write_atomic(self.index_path, lambda path: faiss.write_index(index, path))
         return index
 
-    def _load_or_create_mapping(self) -> List[str]:
+    def _load_or_create_mapping(self) -> Tuple[Dict[int, str], List[str] | None]:
+        """Return (id -> doc_id, legacy positional list if the snapshot predates stable ids)."""
         self.mapping_path.parent.mkdir(parents=True, exist_ok=True)
-        if self.mapping_path.exists():
-            with self.mapping_path.open("r", encoding="utf-8") as file:
-                data = json.load(file)
-                return data.get("mapping", [])
-        self._persist_mapping([])
-        return []
+        if not self.mapping_path.exists():
+            self._persist_mapping({})
+            return {}, None
+        data = _loads(self.mapping_path.read_bytes())
+        if "ids" not in data:
+            return {}, data.get("mapping", [])
+        mapping = dict(zip(data["ids"], data["mapping"]))
+        self._replay_journal(mapping)
+        return mapping, None
+
+    def _replay_journal(self, mapping: Dict[int, str]) -> None:
+        if not self.journal_path.exists() or self.journal_path.stat().st_size == 0:
+            return
+        header_size = _JOURNAL_HEADER.size
+        with self.journal_path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            offset = 0
+            while offset + header_size <= len(buffer):
+                stable_id, length = _JOURNAL_HEADER.unpack_from(buffer, offset)
+                end = offset + header_size + length
+                if end > len(buffer):
+                    break  # torn final record from an interrupted append
+                # Replaying an entry already folded into mapping.json is a no-op.
+                mapping[stable_id] = buffer[offset + header_size:end].decode("utf-8")
+                offset = end
+
+    def _migrate_positional(self, index, legacy_mapping: List[str]):
+        """Convert a pre-IDMap index (row position == list position) to stable ids."""
+        if faiss is not None and not isinstance(index, faiss.IndexIDMap2):
+            # Later rows win: re-embedded docs were appended rather than replaced.
+            latest: Dict[str, int] = {}
+            for position in range(min(index.ntotal, len(legacy_mapping))):
+                latest[legacy_mapping[position]] = position
+            vectors = np.empty((0, self.dimension), dtype="float32")
+            if latest:
+                vectors = index.reconstruct_n(0, index.ntotal)[list(latest.values())]
+            doc_ids = list(latest)
+            index = self._wrap_ids(self._new_index(vectors))
+            if doc_ids:
+                index.add_with_ids(vectors, np.array([_stable_id(d) for d in doc_ids], dtype="int64"))
+        else:
+            doc_ids = list(dict.fromkeys(legacy_mapping))
+        logger.info("Migrated positional FAISS mapping to stable ids (%d docs)", len(doc_ids))
+        return index, {_stable_id(doc_id): doc_id for doc_id in doc_ids}
+
+    def _persist_mapping(self, mapping: Dict[int, str]) -> None:
+        """Write the full mapping snapshot, then drop the journal it supersedes."""
+        def _write(path: str) -> None:
+            with open(path, "wb") as file:
+                file.write(_dumps({"ids": list(mapping.keys()), "mapping": list(mapping.values())}))
+
+        _write_atomic(self.mapping_path, _write)
+        self.journal_path.unlink(missing_ok=True)
+
+    def _append_journal(self, stable_id: int, doc_id: str) -> None:
+        encoded = doc_id.encode("utf-8")
+        with self.journal_path.open("ab") as file:
+            file.write(_JOURNAL_HEADER.pack(stable_id, len(encoded)) + encoded)
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """Defer persistence of add_vector() calls until the block exits (one write, not N)."""
+        self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0 and self._dirty:
+                with self._lock.write():
+                    self._compact_duplicates()
+                    self._upgrade_if_outgrown()
+                    self._persist_index()
+                    self._persist_mapping(self.mapping)
+                    self._dirty = False
+
+    def _new_index(self, matrix: np.ndarray):
+        """Pick (and train, if needed) an empty index for the rows in ``matrix``."""
+        if faiss is None:
+            return _NumpyIndexFlatIP(self.dimension)
+        count = int(matrix.shape[0])
+        quantize = settings.FAISS_SCALAR_QUANTIZE and count >= _SQ_MIN_TRAIN
+        if count > _HNSW_THRESHOLD:
+            # Inner product on L2-normalised vectors keeps cosine semantics.
+            if quantize:
+                index = faiss.IndexHNSWSQ(
+                    self.dimension, faiss.ScalarQuantizer.QT_8bit, _HNSW_M, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                index = faiss.IndexHNSWFlat(self.dimension, _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = _HNSW_EF_SEARCH
+        elif quantize:
+            # int8 codes cut memory traffic in the scan ~4x versus float32.
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            return faiss.IndexFlatIP(self.dimension)
+        if not index.is_trained:
+            index.train(matrix)
+        return index
 
-    def _persist_mapping(self, mapping: List[str]) -> None:
-        with self.mapping_path.open("w", encoding="utf-8") as file:
-            json.dump({"mapping": mapping}, file)
+    def _upgrade_if_outgrown(self) -> None:
+        """Swap a flat scan for HNSW once incremental inserts cross the threshold.
+
+        Caller holds the write lock. rebuild() already picks HNSW for large corpora;
+        this covers stores that only grow through add_vector().
+        """
+        if faiss is None or self.index.ntotal <= _HNSW_THRESHOLD:
+            return
+        inner = faiss.downcast_index(self.index.index)
+        if isinstance(inner, faiss.IndexHNSW):
+            return
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+        ids = faiss.vector_to_array(self.index.id_map)
+        index = self._wrap_ids(self._new_index(vectors))
+        index.add_with_ids(vectors, ids)
+        self.index = index
+        logger.info("FAISS index upgraded to HNSW at %d vectors", index.ntotal)
+
+    def _compact_duplicates(self) -> None:
+        """Rebuild the index keeping only the newest vector per id.
+
+        Caller holds the write lock. Only needed after a re-embed into an index
+        that cannot delete (HNSW), where the old vector would keep matching.
+        """
+        if not self._has_duplicates:
+            return
+        inner = faiss.downcast_index(self.index.index)
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+        ids = faiss.vector_to_array(self.index.id_map)
+        # Last occurrence wins: np.unique on the reversed ids finds each id's newest row.
+        _, newest_from_end = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(ids.shape[0] - 1 - newest_from_end)
+        index = self._wrap_ids(self._new_index(vectors[keep]))
+        index.add_with_ids(vectors[keep], ids[keep])
+        self.index = index
+        self._has_duplicates = False
+        logger.info("FAISS index compacted to %d vectors after in-place re-embeds", index.ntotal)
 
     def _persist_index(self) -> None:
         if faiss is None:
             return
-        faiss.write_index(self.index, str(self.index_path))
-
-    def add_vector(self, vector: np.ndarray, doc_id: str) -> int:
-        with self._lock:
+        index = self.index
+        _write_atomic(self.index_path, lambda path: faiss.write_index(index, path))
+
+    def add_vector(self, vector: np.ndarray, doc_id: str, *, assume_normalized: bool = True) -> int:
+        """Insert or replace ``doc_id``'s vector and return its stable id.
+
+        NlpPipeline embeddings are already unit-length, so by default a float32
+        vector is added as-is (no copy, no extra pass); pass
+        ``assume_normalized=False`` for vectors from anywhere else.
+        """
+        stable_id = _stable_id(doc_id)
+        ids = np.array([stable_id], dtype="int64")
+        self._ensure_loaded()
+        with self._lock.write():
             vector = np.asarray(vector, dtype="float32").reshape(1, -1)
-            vector = _normalize_l2(vector)
-            self.index.add(vector)
-            self.mapping.append(doc_id)
-            self._persist_index()
-            self._persist_mapping(self.mapping)
-            return len(self.mapping) - 1
-
-    def search(self, vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
-        if self.index.ntotal == 0:
-            return []
-        with self._lock:
-            query = np.asarray(vector, dtype="float32").reshape(1, -1)
-            query = _normalize_l2(query)
-            scores, indices = self.index.search(query, k)
-
-        results = []
-        for idx, score in zip(indices[0].tolist(), scores[0].tolist()):
-            if idx == -1 or idx >= len(self.mapping):
-                continue
-            results.append((self.mapping[idx], float(score)))
-        return results
+            if not assume_normalized:
+                vector = _normalize_l2(vector)
+            if stable_id in self.mapping:
+                # Re-embedding a doc replaces its vector instead of adding a duplicate.
+                try:
+                    self.index.remove_ids(ids)
+                except RuntimeError:
+                    logger.warning("FAISS index cannot remove %s in place; compacting it", doc_id)
+                    self._has_duplicates = True
+            self.index.add_with_ids(vector, ids)
+            self.mapping[stable_id] = doc_id
+            if self._bulk_depth:
+                self._dirty = True
+            else:
+                self._compact_duplicates()
+                self._upgrade_if_outgrown()
+                self._persist_index()
+                self._append_journal(stable_id, doc_id)
+            return stable_id
+
+    def search(self, vector: np.ndarray, k: int, *, assume_normalized: bool = True) -> List[Tuple[str, float]]:
+        query = _query_buffer(self.dimension)
+        np.copyto(query[0], vector, casting="same_kind")
+        if not assume_normalized:
+            _normalize_l2_inplace(query)
+        self._ensure_loaded()
+        with self._lock.read():
+            # Rebuild swaps index and mapping together, so take both references once.
+            index = self.index
+            mapping = self.mapping
+            if index.ntotal == 0:
+                return []
+            scores, indices = index.search(query, k)
+
+        # Drop FAISS's -1 padding in one mask, then convert each column with a single tolist().
+        found = indices[0] != -1
+        doc_ids = map(mapping.get, indices[0][found].tolist())
+        return [
+            (doc_id, score)
+            for doc_id, score in zip(doc_ids, scores[0][found].tolist())
+            if doc_id is not None
+        ]
 
     def rebuild(self, vectors: List[np.ndarray], doc_ids: List[str]) -> None:
-        with self._lock:
-            # Rebuild keeps vectors contiguous for fast similarity search.
-            if faiss is not None:
-                self.index = faiss.IndexFlatIP(self.dimension)
-            else:
-                self.index = _NumpyIndexFlatIP(self.dimension)
-            if vectors:
-                matrix = np.asarray(vectors, dtype="float32")
-                matrix = _normalize_l2(matrix)
-                self.index.add(matrix)
-            self.mapping = doc_ids
+        # Build the replacement outside the lock so searches keep serving the old index.
+        # Rebuild keeps vectors contiguous for fast similarity search.
+        matrix = np.asarray(vectors, dtype="float32").reshape(-1, self.dimension)
+        matrix = _normalize_l2(matrix)
+        ids = np.array([_stable_id(doc_id) for doc_id in doc_ids], dtype="int64")
+        index = self._wrap_ids(self._new_index(matrix))
+        if matrix.shape[0]:
+            index.add_with_ids(matrix, ids)
+        with self._lock.write():
+            self.index = index
+            self.mapping = dict(zip(ids.tolist(), doc_ids))
             self._persist_index()
             self._persist_mapping(self.mapping)
+            self._dirty = False
+            self._has_duplicates = False
 
 
 faiss_store = FaissStore(dimension=settings.EMBEDDING_DIM)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import os
 import re
 from typing import List, TYPE_CHECKING
 
 import numpy as np
 
+try:
+    import ahocorasick
+except Exception:  # pragma: no cover - exercised only when the pyahocorasick extension is unavailable
+    ahocorasick = None
+
 from app.core.config import settings
+from app.services.embed_cache import embed_cache
 
 if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
@@ -53,9 +60,44 @@ _HEADER_PATTERNS = re.compile(
     re.IGNORECASE,
 )
 
+_HEADER_STEMS = (
+    "question", "round", "technical", "hr", "coding", "managerial", "online", "tip",
+    "advice", "overall", "summary", "experience", "interview", "preparation", "project", "topic",
+)
+
 # Minimum length to be considered a real question (filters out stubs like "Q1?")
 _MIN_QUESTION_LENGTH = 12
 
+_ENCODE_BATCH_SIZE = 32
+_BULK_ENCODE_BATCH_SIZE = 64
+_PIPE_BATCH_SIZE = 32
+_UNUSED_SPACY_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+# Dynamic int8 quantization tuned for VNNI CPUs; the ONNX file lands under
+# <MODELS_DIR>/<model>/onnx/ next to the fp32 export it was built from.
+_QUANTIZE_CONFIG = "avx512_vnni"
+_QUANTIZED_ONNX_FILE = f"onnx/model_qint8_{_QUANTIZE_CONFIG}.onnx"
+
+# Leading "Q1:" / "Q:" marker, then an optional "Question:" / "Asked:" label —
+# both strips in one anchored pass.
+_PREFIX_RE = re.compile(
+    r"^(?:q\d*[\s:.\-]+)?\s*(?:(?:question|asked|they\s+asked|we\s+were\s+asked)\s*[:.\-]+\s*)?",
+    re.IGNORECASE,
+)
+_WS_RE = re.compile(r"\s+")
+
+# Lines that could pass extract_questions' pass-1 check (starts like a
+# QUESTION_PREFIXES entry or ends in "?" once bullets are stripped), found in
+# one scan. Line boundaries are exactly those of str.splitlines().
+_LINE_BREAKS = "\n\r\v\f\x1c-\x1e\x85\u2028\u2029"
+_LINE_EDGE = rf"(?:[-•]|[^\S{_LINE_BREAKS}])*"
+_LINE_CANDIDATE_RE = re.compile(
+    rf"(?<![^{_LINE_BREAKS}]){_LINE_EDGE}"
+    rf"(?:[qatw][^{_LINE_BREAKS}]*|[^{_LINE_BREAKS}]*\?{_LINE_EDGE})"
+    rf"(?![^{_LINE_BREAKS}])",
+    re.IGNORECASE,
+)
+
 CODING_KEYWORDS = [
     "algorithm",
     "array",
@@ -138,14 +180,68 @@ TOPIC_KEYWORDS = {
 }
 
 
+def _flatten_topic_keywords() -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """Each distinct keyword once, with every topic that lists it."""
+    topics_by_keyword: dict[str, list[str]] = {}
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        for kw in keywords:
+            topics_by_keyword.setdefault(kw, []).append(topic)
+    return tuple((kw, tuple(topics)) for kw, topics in topics_by_keyword.items())
+
+
+_KEYWORD_TOPICS = _flatten_topic_keywords()
+
+
+def _build_keyword_automaton():
+    """Compile every topic keyword into one Aho-Corasick automaton (keyword -> topics)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw, topics in _KEYWORD_TOPICS:
+        automaton.add_word(kw, (kw, topics))
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _topic_keyword_hits(lowered: str) -> dict[str, int]:
+    """Number of distinct keywords of each topic that occur in ``lowered``."""
+    hits: dict[str, int] = {}
+    if _KEYWORD_AUTOMATON is None:
+        # Substring test per distinct keyword; shared keywords are scanned once.
+        for kw, topics in _KEYWORD_TOPICS:
+            if kw in lowered:
+                for topic in topics:
+                    hits[topic] = hits.get(topic, 0) + 1
+        return hits
+    # One pass over the text in C; a keyword counts once however often it appears.
+    seen: set[str] = set()
+    for _, (kw, topics) in _KEYWORD_AUTOMATON.iter(lowered):
+        if kw in seen:
+            continue
+        seen.add(kw)
+        for topic in topics:
+            hits[topic] = hits.get(topic, 0) + 1
+    return hits
+
+
+def _mean_embedding(sentence_embeddings: np.ndarray) -> np.ndarray:
+    """Document vector as the L2-normalised mean of its (unit-length) sentence vectors."""
+    mean = sentence_embeddings.mean(axis=0)
+    mean /= np.linalg.norm(mean) + 1e-9
+    return mean
+
+
 def _classify_question_topic(text: str) -> str:
     """Classify a single question into its most specific topic."""
-    lowered = text.lower()
+    hits = _topic_keyword_hits(text.lower())
     # Score each topic by keyword hits; return the best match.
     best_topic = "General"
     best_score = 0
-    for topic, keywords in TOPIC_KEYWORDS.items():
-        score = sum(1 for kw in keywords if kw in lowered)
+    for topic in TOPIC_KEYWORDS:
+        score = hits.get(topic, 0)
         if score > best_score:
             best_score = score
             best_topic = topic
@@ -155,7 +251,11 @@ def _classify_question_topic(text: str) -> str:
 def _is_section_header(text: str) -> bool:
     """Return True if the text looks like a section header, not a question."""
     stripped = text.strip().rstrip(":").strip()
-    if _HEADER_PATTERNS.match(stripped):
+    # Every header pattern begins with one of these stems, so most lines are
+    # rejected without entering the regex. Non-ASCII text goes straight to the
+    # regex, whose Unicode case-folding str.lower() does not reproduce.
+    prefiltered = not stripped.isascii() or stripped.lower().startswith(_HEADER_STEMS)
+    if prefiltered and _HEADER_PATTERNS.match(stripped):
         return True
     # Very short labels like "Questions:" or "Round 1:"
     if len(stripped) < 8 and not stripped.endswith("?"):
@@ -181,22 +281,32 @@ def _compute_confidence(text: str) -> float:
 
 def _normalize_question(text: str) -> str:
     """Strip leading prefixes like 'Q1:', 'Q:', bullet markers etc."""
-    cleaned = text.strip()
-    # Remove leading "Q1:", "Q2:", "Q:" etc.
-    cleaned = re.sub(r"^[Qq]\d*[\s:.\-]+", "", cleaned).strip()
-    # Remove leading "Question:", "Asked:", etc.
-    cleaned = re.sub(
-        r"^(question|asked|they\s+asked|we\s+were\s+asked)\s*[:.\-]+\s*",
-        "",
-        cleaned,
-        flags=re.IGNORECASE,
-    ).strip()
+    # Remove leading "Q1:", "Q2:", "Q:" then "Question:", "Asked:", etc.
+    cleaned = _PREFIX_RE.sub("", text.strip(), count=1).strip()
     # Capitalize first letter
     if cleaned and cleaned[0].islower():
         cleaned = cleaned[0].upper() + cleaned[1:]
     return cleaned
 
 
+def _configure_torch_threads() -> None:
+    """Pin torch's CPU thread pools; container defaults often leave cores idle.
+
+    Override with HIRELOG_TORCH_THREADS. Runs at model-load time, not import,
+    so importing this module stays cheap.
+    """
+    try:
+        import torch
+    except Exception:
+        return
+    threads = int(os.environ.get("HIRELOG_TORCH_THREADS", max(1, os.cpu_count() or 1)))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(max(1, threads // 2))
+    except RuntimeError:
+        pass  # only settable before the first inter-op parallel region
+
+
 class NlpPipeline:
     def __init__(self) -> None:
         self._model: SentenceTransformer | None = None
@@ -208,16 +318,60 @@ class NlpPipeline:
             import spacy as _spacy
             from sentence_transformers import SentenceTransformer as _ST
             logger = __import__("logging").getLogger(__name__)
-            try:
-                logger.info("Loading SentenceTransformer model (ONNX backend)...")
-                self._model = _ST(settings.EMBEDDING_MODEL, backend="onnx")
-            except Exception:
-                logger.warning("ONNX runtime unavailable; falling back to default SentenceTransformer backend")
-                self._model = _ST(settings.EMBEDDING_MODEL)
+            _configure_torch_threads()
+            model = None
+            backend = "int8"
+            if settings.EMBEDDING_QUANTIZE:
+                try:
+                    logger.info("Loading SentenceTransformer model (int8 ONNX backend)...")
+                    model = self._load_quantized_model(_ST)
+                except Exception:
+                    logger.warning("Quantized ONNX model unavailable; using fp32 weights", exc_info=True)
+            if model is None:
+                try:
+                    logger.info("Loading SentenceTransformer model (ONNX backend)...")
+                    model = _ST(settings.EMBEDDING_MODEL, backend="onnx")
+                    backend = "onnx"
+                except Exception:
+                    logger.warning("ONNX runtime unavailable; falling back to default SentenceTransformer backend")
+                    model = _ST(settings.EMBEDDING_MODEL)
+                    backend = "torch"
+            model.eval()
+            # Key cached vectors by what actually loaded, not by what was configured.
+            embed_cache.set_backend(backend)
+            self._model = model
             logger.info("Loading spaCy model...")
-            self._nlp = _spacy.load("en_core_web_sm")
+            # Only doc.sents is consumed, so skip the statistical components and
+            # split with the rule-based sentencizer instead of the parser.
+            self._nlp = _spacy.load("en_core_web_sm", exclude=_UNUSED_SPACY_COMPONENTS)
+            self._nlp.add_pipe("sentencizer")
             logger.info("NLP models loaded.")
 
+    @staticmethod
+    def _load_quantized_model(st_cls) -> SentenceTransformer:
+        """Load the int8 ONNX export, building and caching it on first run."""
+        import onnxruntime as _ort
+
+        save_dir = settings.models_dir_path / settings.EMBEDDING_MODEL.replace("/", "__")
+        if not (save_dir / _QUANTIZED_ONNX_FILE).exists():
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            fp32_model = st_cls(settings.EMBEDDING_MODEL, backend="onnx")
+            fp32_model.save(str(save_dir))
+            export_dynamic_quantized_onnx_model(fp32_model, _QUANTIZE_CONFIG, str(save_dir))
+
+        session_options = _ort.SessionOptions()
+        session_options.intra_op_num_threads = os.cpu_count() or 1
+        return st_cls(
+            str(save_dir),
+            backend="onnx",
+            model_kwargs={
+                "file_name": _QUANTIZED_ONNX_FILE,
+                "provider": "CPUExecutionProvider",
+                "session_options": session_options,
+            },
+        )
+
     @property
     def model(self) -> SentenceTransformer:
         self._ensure_loaded()
@@ -230,12 +384,59 @@ class NlpPipeline:
 
     def clean_text(self, text: str) -> str:
         # Normalize whitespace so downstream NLP and embeddings stay consistent.
-        cleaned = re.sub(r"\s+", " ", text).strip()
+        cleaned = _WS_RE.sub(" ", text).strip()
         return cleaned
 
+    def _encode(self, texts, **kwargs):
+        """model.encode without autograd bookkeeping (a no-op cost on ONNX backends)."""
+        try:
+            import torch
+        except Exception:
+            return self.model.encode(texts, **kwargs)
+        with torch.inference_mode():
+            return self.model.encode(texts, **kwargs)
+
     def embed(self, text: str) -> np.ndarray:
-        embedding = self.model.encode(text, normalize_embeddings=True)
-        return np.asarray(embedding, dtype="float32")
+        """Embed one text; the returned array is shared with the cache, so treat it as read-only."""
+        cached = embed_cache.get_many([text])[0]
+        if cached is not None:
+            return cached
+        embedding = np.asarray(self._encode(text, normalize_embeddings=True), dtype="float32")
+        embed_cache.put_many([text], embedding.reshape(1, -1))
+        return embedding
+
+    def embed_many(self, texts: List[str], batch_size: int = _ENCODE_BATCH_SIZE) -> np.ndarray:
+        """Embed ``texts``, encoding only cache misses."""
+        if not texts:
+            return np.empty((0, settings.EMBEDDING_DIM), dtype="float32")
+        cached = embed_cache.get_many(texts)
+        misses = [i for i, vector in enumerate(cached) if vector is None]
+        if not misses:
+            return np.stack(cached)
+        encoded = self._encode_sorted([texts[i] for i in misses], batch_size)
+        embed_cache.put_many([texts[i] for i in misses], encoded)
+        if len(misses) == len(texts):
+            return encoded
+        result = np.empty((len(texts), encoded.shape[1]), dtype="float32")
+        for i, vector in enumerate(cached):
+            if vector is not None:
+                result[i] = vector
+        result[misses] = encoded
+        return result
+
+    def _encode_sorted(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode ``texts`` in one call, length-sorted so each batch pads to similar lengths."""
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        embeddings = self._encode(
+            [texts[i] for i in order],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        embeddings = np.asarray(embeddings, dtype="float32")
+        # Scatter back to the caller's order.
+        return embeddings[np.argsort(order)]
 
     def extract_questions(self, raw_text: str, sentences: List[str]) -> list:
         """Extract actual interview questions from raw text.
@@ -249,8 +450,8 @@ class NlpPipeline:
         candidates: list[str] = []
 
         # Pass 1: line-based extraction (catches bullet lists, Q1: prefixes)
-        for line in raw_text.splitlines():
-            stripped = line.strip("-• \t").strip()
+        for match in _LINE_CANDIDATE_RE.finditer(raw_text):
+            stripped = match.group().strip("-• \t").strip()
             if not stripped:
                 continue
             if _is_section_header(stripped):
@@ -272,15 +473,17 @@ class NlpPipeline:
             normalized = _normalize_question(raw_q)
             if len(normalized) < _MIN_QUESTION_LENGTH:
                 continue
-            dedup_key = re.sub(r"\s+", " ", normalized.lower().strip("? "))
+            dedup_key = _WS_RE.sub(" ", normalized.lower().strip("? "))
             if dedup_key in seen:
                 continue
             seen.add(dedup_key)
             deduped.append(normalized)
+            if len(deduped) == 20:
+                break
 
         # Build structured output
         results: list[dict] = []
-        for q_text in deduped[:20]:
+        for q_text in deduped:
             topic = _classify_question_topic(q_text)
             confidence = _compute_confidence(q_text)
             results.append({
@@ -297,36 +500,93 @@ class NlpPipeline:
         return results
 
     def classify_topics(self, text: str) -> List[str]:
-        lowered = text.lower()
-        topics = []
-        for topic, keywords in TOPIC_KEYWORDS.items():
-            if any(keyword in lowered for keyword in keywords):
-                topics.append(topic)
-        return topics
-
-    def generate_summary(self, sentences: List[str], doc_embedding: np.ndarray) -> str:
+        hits = _topic_keyword_hits(text.lower())
+        return [topic for topic in TOPIC_KEYWORDS if hits.get(topic)]
+
+    def generate_summary(
+        self,
+        sentences: List[str],
+        doc_embedding: np.ndarray,
+        sentence_embeddings: np.ndarray | None = None,
+    ) -> str:
         if not sentences:
             return "No summary available yet. Add more detail to improve the summary."
         if len(sentences) <= 2:
             return " ".join(sentences)
 
-        sentence_embeddings = self.model.encode(sentences, normalize_embeddings=True)
-        sentence_embeddings = np.asarray(sentence_embeddings, dtype="float32")
-        scores = np.dot(sentence_embeddings, doc_embedding)
-        top_indices = scores.argsort()[-3:]
+        if sentence_embeddings is None:
+            sentence_embeddings = self.embed_many(sentences)
+        scores = sentence_embeddings @ doc_embedding
+        # O(N) selection of the three best sentences; only those three get ordered.
+        k = min(3, len(scores))
+        top_indices = np.argpartition(scores, -k)[-k:]
         top_indices_sorted = sorted(top_indices.tolist())
         summary_sentences = [sentences[i] for i in top_indices_sorted]
         summary = " ".join(summary_sentences)
         return summary
 
+    def _sentences(self, cleaned: str) -> List[str]:
+        return [sent.text.strip() for sent in self.nlp(cleaned).sents if sent.text.strip()]
+
+    def embed_document(self, text: str) -> np.ndarray:
+        """Embed a whole document exactly as ``process()`` does, without the rest of the pipeline.
+
+        Every vector stored in FAISS must come from the same method, or search
+        scores would depend on which path indexed the document.
+        """
+        cleaned = self.clean_text(text)
+        sentences = self._sentences(cleaned)
+        if not sentences:
+            return self.embed_many([cleaned])[0]
+        return _mean_embedding(self.embed_many(sentences))
+
     def process(self, raw_text: str) -> dict:
         cleaned = self.clean_text(raw_text)
-        doc = self.nlp(cleaned)
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-        doc_embedding = self.embed(cleaned)
+        sentences = self._sentences(cleaned)
+        if not sentences:
+            embeddings = self.embed_many([cleaned])
+            return self._assemble(raw_text, cleaned, sentences, embeddings[0], embeddings[1:])
+        sentence_embeddings = self.embed_many(sentences)
+        doc_embedding = _mean_embedding(sentence_embeddings)
+        return self._assemble(raw_text, cleaned, sentences, doc_embedding, sentence_embeddings)
+
+    def process_batch(self, raw_texts: List[str]) -> List[dict]:
+        """``process()`` for many documents: one spaCy pipe and one encode call for all of them."""
+        cleaned = [self.clean_text(text) for text in raw_texts]
+        all_sentences = [
+            [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+            for doc in self.nlp.pipe(cleaned, batch_size=_PIPE_BATCH_SIZE)
+        ]
+        # Documents are embedded from their sentences; only sentence-less ones need a whole-text pass.
+        whole_text = [i for i, sentences in enumerate(all_sentences) if not sentences]
+        embeddings = self.embed_many(
+            [cleaned[i] for i in whole_text] + [sentence for sentences in all_sentences for sentence in sentences],
+            batch_size=_BULK_ENCODE_BATCH_SIZE,
+        )
+        whole_text_embeddings = dict(zip(whole_text, embeddings))
+
+        results: List[dict] = []
+        offset = len(whole_text)
+        for i, sentences in enumerate(all_sentences):
+            sentence_embeddings = embeddings[offset:offset + len(sentences)]
+            offset += len(sentences)
+            doc_embedding = whole_text_embeddings[i] if not sentences else _mean_embedding(sentence_embeddings)
+            results.append(
+                self._assemble(raw_texts[i], cleaned[i], sentences, doc_embedding, sentence_embeddings)
+            )
+        return results
+
+    def _assemble(
+        self,
+        raw_text: str,
+        cleaned: str,
+        sentences: List[str],
+        doc_embedding: np.ndarray,
+        sentence_embeddings: np.ndarray,
+    ) -> dict:
         questions = self.extract_questions(raw_text, sentences)
         topics = self.classify_topics(cleaned)
-        summary = self.generate_summary(sentences, doc_embedding)
+        summary = self.generate_summary(sentences, doc_embedding, sentence_embeddings)
         return {
             "cleaned_text": cleaned,
             "questions": questions,
@@ -13,9 +13,24 @@ try:
 except Exception:  # pragma: no cover - redis is optional in some dev setups
     redis = None
 
+try:
+    msgspec = importlib.import_module("msgspec")
+except Exception:  # pragma: no cover - falls back to JSON payloads in Redis
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
 
+def _build_codec():
+    """Redis payload (encode, decode): msgpack when msgspec is installed, else JSON."""
+    if msgspec is not None:
+        return msgspec.msgpack.Encoder().encode, msgspec.msgpack.Decoder(dict).decode
+    return (lambda data: json.dumps(data).encode("utf-8")), json.loads
+
+
+_encode_payload, _decode_payload = _build_codec()
+
+
 class SearchCache:
     def __init__(self) -> None:
         self._ttl_seconds = max(30, int(settings.SEARCH_CACHE_TTL_SECONDS))
@@ -29,7 +44,8 @@ class SearchCache:
             return None
 
         try:
-            client = redis.Redis.from_url(settings.SEARCH_REDIS_URL, decode_responses=True)
+            # Payloads are binary (msgpack); keys stay ASCII.
+            client = redis.Redis.from_url(settings.SEARCH_REDIS_URL)
             client.ping()
             logger.info("Search cache using Redis backend")
             return client
@@ -61,7 +77,7 @@ class SearchCache:
             try:
                 raw = self._redis.get(key)
                 if raw:
-                    parsed = json.loads(raw)
+                    parsed = _decode_payload(raw)
                     if isinstance(parsed, dict):
                         return parsed
             except Exception:
@@ -72,7 +88,7 @@ class SearchCache:
     def set(self, key: str, data: dict) -> None:
         if self._redis is not None:
             try:
-                self._redis.setex(key, self._ttl_seconds, json.dumps(data))
+                self._redis.setex(key, self._ttl_seconds, _encode_payload(data))
             except Exception:
                 logger.exception("Redis cache write failed for key=%s", key)
 
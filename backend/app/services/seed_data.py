@@ -9,6 +9,7 @@ from firebase_admin import firestore
 from app.core.firebase import db
 from app.services.faiss_store import faiss_store
 from app.services.nlp import pipeline
+from app.utils.serialization import derive_question_fields, get_contributor_display
 
 
 SEED_VERSION = "v1"
@@ -453,7 +454,7 @@ def ensure_seeded(count: int = SEED_COUNT) -> dict:
     rng = random.Random(42)
     records = generate_seed_records(count, rng)
 
-    created = 0
+    pending = []
     for record in records:
         doc_ref = db.collection("interview_experiences").document(record.doc_id)
         snapshot = doc_ref.get()
@@ -461,13 +462,19 @@ def ensure_seeded(count: int = SEED_COUNT) -> dict:
             existing = snapshot.to_dict() or {}
             if existing.get("embedding_id") is not None:
                 continue
+        pending.append((record, doc_ref))
+
+    # Run NLP for every pending record in one batch rather than per record.
+    processed_batch = pipeline.process_batch([record.raw_text for record, _ in pending]) if pending else []
 
-        processed = pipeline.process(record.raw_text)
-        topics = processed["topics"] or record.topics
-        embedding_id = faiss_store.add_vector(processed["embedding"], doc_ref.id)
+    created = 0
+    # Persist the FAISS index once for the whole batch instead of once per record.
+    with faiss_store.bulk():
+        for (record, doc_ref), processed in zip(pending, processed_batch):
+            topics = processed["topics"] or record.topics
+            embedding_id = faiss_store.add_vector(processed["embedding"], doc_ref.id)
 
-        doc_ref.set(
-            {
+            doc_data = {
                 "company": record.company,
                 "role": record.role,
                 "year": record.year,
@@ -477,16 +484,17 @@ def ensure_seeded(count: int = SEED_COUNT) -> dict:
                 "extracted_questions": processed["questions"],
                 "topics": topics,
                 "summary": processed["summary"],
-                "embedding_id": embedding_id,
+                "embedding_id": str(embedding_id),
                 "created_by": SEED_UID,
                 "created_at": firestore.SERVER_TIMESTAMP,
                 "is_active": True,
                 "is_anonymous": False,
                 "edit_history": [],
-            },
-            merge=True,
-        )
-        created += 1
+            }
+            doc_data.update(derive_question_fields(processed["questions"]))
+            doc_data["contributor_display"] = get_contributor_display(doc_data)
+            doc_ref.set(doc_data, merge=True)
+            created += 1
 
     meta_ref.set(
         {
@@ -1,20 +1,121 @@
 from __future__ import annotations
 
-from datetime import datetime
+import functools
+from datetime import datetime, timedelta
 from typing import Any
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - stdlib-only fallback
+    orjson = None
 
-def _convert_value(value: Any) -> Any:
+_ANONYMOUS = "Anonymous"
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_isoformat(value: datetime, utcoffset: timedelta | None) -> str:
+    # Equal datetimes in different zones hash alike; keying on the offset keeps their strings apart.
+    return value.isoformat()
+
+
+def _isoformat(value: datetime) -> str:
+    """``value.isoformat()``, memoised: docs repeat the same created_at/updated_at stamps."""
+    return _cached_isoformat(value, value.utcoffset())
+
+
+def _isoformat_default(value: Any) -> str:
+    # Firestore returns DatetimeWithNanoseconds, a subclass orjson won't encode natively.
     if isinstance(value, datetime):
-        return value.isoformat()
-    if isinstance(value, list):
-        return [_convert_value(item) for item in value]
-    if isinstance(value, dict):
-        return {key: _convert_value(val) for key, val in value.items()}
-    return value
+        return _isoformat(value)
+    raise TypeError(f"unsupported type: {type(value).__name__}")
+
+
+def _convert_value(
+    value: Any,
+    _isinstance=isinstance,
+    _datetime=datetime,
+    _containers=(list, dict),
+) -> Any:
+    """Datetimes -> ISO strings, copy-on-write: containers without one are returned as-is.
+
+    Walks with an explicit stack rather than recursion, so nesting depth costs
+    no Python frames and cannot hit the recursion limit. Builtins are bound as
+    defaults so the loop reads locals, not globals.
+    """
+    if _isinstance(value, _datetime):
+        return _isoformat(value)
+    if not _isinstance(value, _containers):
+        return value
+
+    # Frame: [container, its (key, item) iterator, copy made on first change, key being descended into]
+    stack = [[value, _entries(value), None, None]]
+    while True:
+        frame = stack[-1]
+        for key, item in frame[1]:
+            if _isinstance(item, _datetime):
+                converted = _isoformat(item)
+            elif _isinstance(item, _containers):
+                frame[3] = key
+                stack.append([item, _entries(item), None, None])
+                break
+            else:
+                continue
+            if frame[2] is None:
+                frame[2] = frame[0].copy()
+            frame[2][key] = converted
+        else:
+            stack.pop()
+            done = frame[0] if frame[2] is None else frame[2]
+            if not stack:
+                return done
+            if done is not frame[0]:
+                parent = stack[-1]
+                if parent[2] is None:
+                    parent[2] = parent[0].copy()
+                parent[2][parent[3]] = done
+
+
+def _entries(container: list | dict):
+    return enumerate(container) if isinstance(container, list) else iter(container.items())
+
 
+# Every datetime goes through the memoised isoformat rather than orjson's own
+# RFC 3339 writer, which rounds sub-minute UTC offsets; Firestore's
+# DatetimeWithNanoseconds takes the default= hook regardless.
+_DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME if orjson is not None else 0
 
-def _get_contributor_display(data: dict) -> str:
+
+def _convert_container(value: dict | list) -> Any:
+    """``_convert_value`` for a dict or list, with the tree walk done by orjson in C.
+
+    Values orjson cannot encode (GeoPoint, DocumentReference, bytes...) fall back
+    to the Python walk, which passes them through untouched. So does any payload
+    containing ``null``: orjson writes NaN/Infinity as null, and only the walk
+    keeps them (nested nulls are rare, so this seldom costs anything).
+    """
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(value, default=_isoformat_default, option=_DUMPS_OPTIONS)
+        except TypeError:
+            pass
+        else:
+            if b"null" not in payload:
+                return orjson.loads(payload)
+    return _convert_value(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_label(visibility: str | None, public_label: str | None) -> str:
+    # Feeds repeat a handful of (visibility, label) pairs, so this is mostly cache hits.
+    # Only show a label if explicitly public AND a label was stored
+    if visibility == "public":
+        label = (public_label or "").strip()
+        if label:
+            return label
+    return _ANONYMOUS
+
+
+def get_contributor_display(data: dict) -> str:
     """Derive the public contributor display string.
 
     STRICT ANONYMITY CONTRACT:
@@ -30,21 +131,17 @@ def _get_contributor_display(data: dict) -> str:
     MIGRATION: Legacy docs without author.visibility are treated as anonymous.
     Any previously inferred labels (e.g. "S.A.S.") are stripped.
     """
-    if data.get("is_anonymous") is True:
-        return "Anonymous"
-
-    author = data.get("author") or {}
-    visibility = author.get("visibility", "")
+    is_anonymous = data.get("is_anonymous")
+    if is_anonymous is True:
+        return _ANONYMOUS
 
-    # Only show a label if explicitly public AND a label was stored
-    if visibility == "public":
-        label = author.get("public_label", "").strip()
-        if label:
-            return label
+    author = data.get("author")
+    if author:
+        return _resolve_label(author.get("visibility"), author.get("public_label"))
 
-    # Legacy fallback: check top-level is_anonymous flag
-    # If is_anonymous is explicitly False AND show_name is True, use stored label
-    if not author and data.get("is_anonymous") is False and data.get("show_name") is True:
+    # Legacy fallback (docs without an author block): if is_anonymous is
+    # explicitly False AND show_name is True, use stored label
+    if is_anonymous is False and data.get("show_name") is True:
         name = data.get("contributor_name") or ""
         if name:
             parts = name.strip().split()
@@ -53,7 +150,7 @@ def _get_contributor_display(data: dict) -> str:
             elif parts:
                 return parts[0]
 
-    return "Anonymous"
+    return _ANONYMOUS
 
 
 def _is_experience_doc(data: dict) -> bool:
@@ -82,49 +179,106 @@ def _apply_privacy_redaction(result: dict, data: dict, *, include_private: bool)
     return result
 
 
-def _ensure_questions_and_stats(result: dict) -> dict:
-    """Ensure every experience doc has the nested questions + explicit stats.
+def serialize_doc(
+    doc_snapshot,
+    *,
+    include_contributor: bool = False,
+    include_private: bool = False,
+) -> dict:
+    return serialize_data(
+        doc_snapshot.to_dict() or {},
+        doc_snapshot.id,
+        include_contributor=include_contributor,
+        include_private=include_private,
+        owned=True,
+    )
+
+
+def project_snapshot(doc_snapshot, fields: frozenset[str]) -> dict:
+    """The listed fields of a snapshot, without ``to_dict()``'s deepcopy of the whole doc.
 
-    Handles backwards-compatible docs that only have the flat
-    ``extracted_questions`` list by deriving the nested structure from it.
+    Values are shared with the snapshot, so treat them as read-only (the
+    serializers below never mutate nested values).
     """
-    flat = result.get("extracted_questions") or []
-
-    # Build nested questions if missing
-    if not result.get("questions"):
-        user_provided = [q for q in flat if isinstance(q, dict) and q.get("source") == "user"]
-        ai_extracted = [q for q in flat if isinstance(q, dict) and q.get("source") != "user"]
-        result["questions"] = {
-            "user_provided": user_provided,
-            "ai_extracted": ai_extracted,
-        }
-
-    # Build explicit stats if missing
-    if not result.get("stats"):
-        nested = result["questions"]
-        up = nested.get("user_provided") or []
-        ae = nested.get("ai_extracted") or []
-        result["stats"] = {
-            "user_question_count": len(up),
-            "extracted_question_count": len(ae),
-            "total_question_count": len(up) + len(ae),
-        }
+    source = getattr(doc_snapshot, "_data", None)
+    if source is None:
+        source = doc_snapshot.to_dict() or {}
+    return {key: source[key] for key in fields if key in source}
 
-    return result
 
+def derive_question_fields(flat: list, nested: dict | None = None) -> dict:
+    """Build the nested ``questions`` + ``stats`` fields from the flat question list.
 
-def serialize_doc(
-    doc_snapshot,
+    Legacy docs only carry ``extracted_questions``; an existing nested
+    structure is kept and only counted.
+    """
+    if not nested:
+        # buckets[True] is user-provided, buckets[False] AI-extracted: the
+        # comparison result indexes the bucket instead of an if/else per question.
+        buckets: tuple[list, list] = ([], [])
+        for question in flat:
+            if isinstance(question, dict):
+                buckets[question.get("source") == "user"].append(question)
+        nested = {"user_provided": buckets[True], "ai_extracted": buckets[False]}
+
+    user_count = len(nested.get("user_provided") or [])
+    extracted_count = len(nested.get("ai_extracted") or [])
+    return {
+        "questions": nested,
+        "stats": {
+            "user_question_count": user_count,
+            "extracted_question_count": extracted_count,
+            "total_question_count": user_count + extracted_count,
+        },
+    }
+
+
+def serialize_data(
+    data: dict,
+    doc_id: str,
     *,
     include_contributor: bool = False,
     include_private: bool = False,
+    owned: bool = False,
 ) -> dict:
-    data = doc_snapshot.to_dict() or {}
-    data["id"] = doc_snapshot.id
-    result = _convert_value(data)
-    result = _apply_privacy_redaction(result, data, include_private=include_private)
+    """Serialize an already-materialized document dict (e.g. one built after a write).
+
+    ``owned=True`` means the caller hands ``data`` over (a fresh ``to_dict()``),
+    so its top-level slots are overwritten in place instead of copied into a
+    new dict; nested containers are still converted by copy.
+
+    One pass over the top-level fields converts datetimes and picks up
+    ``extracted_questions``. The nested questions + explicit stats every
+    experience doc must carry are stored at write time; they are derived from
+    the flat list only for docs the backfill has not reached yet.
+    """
+    data["id"] = doc_id
+    result: dict = data if owned else {}
+    flat: list = []
+    for key, value in data.items():
+        if isinstance(value, datetime):
+            value = _isoformat(value)
+        elif isinstance(value, (dict, list)):
+            value = _convert_container(value)
+            if key == "extracted_questions" and isinstance(value, list):
+                flat = value
+        # Reassigning an existing key does not resize the dict, so this is safe mid-iteration.
+        result[key] = value
+
+    embedding_id = result.get("embedding_id")
+    if isinstance(embedding_id, int):
+        # Docs indexed before ids were stored as strings; 64-bit ids lose precision as JSON numbers.
+        result["embedding_id"] = str(embedding_id)
+
     if include_contributor:
-        result["contributor_display"] = _get_contributor_display(data)
-    # Always ensure nested questions + stats are present
-    result = _ensure_questions_and_stats(result)
+        # Stored at write time; derive only for docs written before that. Derived
+        # before redaction, which may null contributor_name on an owned dict.
+        result["contributor_display"] = data.get("contributor_display") or get_contributor_display(data)
+    result = _apply_privacy_redaction(result, data, include_private=include_private)
+
+    stats = result.get("stats")
+    if not stats or not result.get("questions"):
+        derived = derive_question_fields(flat, result.get("questions"))
+        result["questions"] = derived["questions"]
+        result["stats"] = stats or derived["stats"]
     return result
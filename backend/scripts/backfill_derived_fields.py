@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+import sys
+
+# Insert (not append) so backend/app wins over any installed package named app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Firestore caps a WriteBatch at 500 operations.
+_BATCH_SIZE = 400
+_FIELDS = [
+    "is_anonymous", "author", "show_name", "contributor_name", "contributor_display",
+    "extracted_questions", "questions", "stats",
+]
+
+
+def _missing_fields(data: dict) -> dict:
+    from app.utils.serialization import derive_question_fields, get_contributor_display
+
+    updates: dict = {}
+    if not data.get("contributor_display"):
+        updates["contributor_display"] = get_contributor_display(data)
+    if not data.get("questions") or not data.get("stats"):
+        flat = data.get("extracted_questions")
+        derived = derive_question_fields(flat if isinstance(flat, list) else [], data.get("questions"))
+        if not data.get("questions"):
+            updates["questions"] = derived["questions"]
+        if not data.get("stats"):
+            updates["stats"] = derived["stats"]
+    return updates
+
+
+def main() -> None:
+    """One-off: store the derived fields on experiences written before they were materialized."""
+    from app.core.firebase import db
+
+    batch = db.batch()
+    pending = 0
+    scanned = 0
+    updated = 0
+    for snapshot in db.collection("interview_experiences").select(_FIELDS).stream():
+        scanned += 1
+        updates = _missing_fields(snapshot.to_dict() or {})
+        if not updates:
+            continue
+        batch.update(snapshot.reference, updates)
+        pending += 1
+        updated += 1
+        if pending == _BATCH_SIZE:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    print(f"Backfill completed: scanned={scanned} updated={updated}")
+
+
+if __name__ == "__main__":
+    main()
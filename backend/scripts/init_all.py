@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+
+# Insert (not append) so backend/app wins over any installed package named app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _bootstrap_firestore() -> str:
+    from firebase_admin import firestore
+
+    from app.core.firebase import db
+
+    # Add further bootstrap writes to this batch; it commits them in one round-trip.
+    batch = db.batch()
+    batch.set(
+        db.collection("metadata").document("bootstrap"),
+        {"bootstrapped_at": firestore.SERVER_TIMESTAMP},
+        merge=True,
+    )
+    batch.commit()
+    return "Firebase connection verified and bootstrap document created."
+
+
+def _touch_faiss() -> str:
+    from app.services.faiss_store import faiss_store
+
+    return f"FAISS index ready at {faiss_store.index_path} with {faiss_store.index.ntotal} vectors."
+
+
+async def _run() -> None:
+    # Firestore round-trip and FAISS load are independent; overlap them (and their imports).
+    messages = await asyncio.gather(
+        asyncio.to_thread(_bootstrap_firestore),
+        asyncio.to_thread(_touch_faiss),
+    )
+    for message in messages:
+        print(message)
+
+
+def main() -> None:
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+import os
 import sys
-from pathlib import Path
 
-root = Path(__file__).resolve().parents[1]
-sys.path.append(str(root))
-
-from app.services.faiss_store import faiss_store
+# Insert (not append) so backend/app wins over any installed package named app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 def main() -> None:
+    from app.services.faiss_store import faiss_store
+
     print(f"FAISS index ready at {faiss_store.index_path} with {faiss_store.index.ntotal} vectors.")
 
 
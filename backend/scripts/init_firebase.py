@@ -1,21 +1,25 @@
 from __future__ import annotations
 
+import os
 import sys
-from pathlib import Path
 
-root = Path(__file__).resolve().parents[1]
-sys.path.append(str(root))
+# Insert (not append) so backend/app wins over any installed package named app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from firebase_admin import firestore
 
-from app.core.firebase import db
+def main() -> None:
+    from firebase_admin import firestore
 
+    from app.core.firebase import db
 
-def main() -> None:
-    db.collection("metadata").document("bootstrap").set(
+    # Add further bootstrap writes to this batch; it commits them in one round-trip.
+    batch = db.batch()
+    batch.set(
+        db.collection("metadata").document("bootstrap"),
         {"bootstrapped_at": firestore.SERVER_TIMESTAMP},
         merge=True,
     )
+    batch.commit()
     print("Firebase connection verified and bootstrap document created.")
 
 
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
+import os
 import sys
-from pathlib import Path
 
-root = Path(__file__).resolve().parents[1]
-sys.path.append(str(root))
-
-from app.services.seed_data import ensure_seeded
+# Insert (not append) so backend/app wins over any installed package named app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 def main() -> None:
+    from app.services.seed_data import ensure_seeded
+
     report = ensure_seeded()
-    print(f"Seed completed: {report}")
+    # One JSON line, so CI log ingestion can parse the report.
+    try:
+        import orjson
+    except Exception:
+        import json
+
+        payload = json.dumps(report, default=str)
+    else:
+        payload = orjson.dumps(report, default=str).decode()
+    print(f"Seed completed: {payload}")
 
 
 if __name__ == "__main__":
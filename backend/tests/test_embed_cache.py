@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import nlp
+from app.services.embed_cache import EmbeddingCache
+
+
+def _cache(backend: str | None) -> EmbeddingCache:
+    cache = EmbeddingCache()
+    if backend is not None:
+        cache.set_backend(backend)
+    return cache
+
+
+def test_vectors_round_trip_through_disk(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EMBED_CACHE_PATH", str(tmp_path / "embed_cache.db"))
+    vectors = np.arange(8, dtype="float32").reshape(2, 4)
+
+    _cache("int8").put_many(["alpha", "beta"], vectors)
+    hits = _cache("int8").get_many(["beta", "gamma", "alpha"])
+
+    assert hits[1] is None
+    np.testing.assert_array_equal(hits[0], vectors[1])
+    np.testing.assert_array_equal(hits[2], vectors[0])
+    assert not hits[0].flags.writeable
+    assert _cache("onnx").get_many(["alpha"]) == [None]
+    assert _cache(None).get_many(["alpha"]) == [None]
+
+
+def test_quantized_load_failure_caches_under_fallback_backend(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class FakeModel:
+        def __init__(self, name: str, backend: str | None = None, **kwargs) -> None:
+            pass
+
+        def eval(self) -> None:
+            pass
+
+        def encode(self, texts, **kwargs) -> np.ndarray:
+            return np.ones(4, dtype="float32") if isinstance(texts, str) else np.ones((len(texts), 4), dtype="float32")
+
+    class FakeSpacy:
+        def add_pipe(self, name: str) -> None:
+            pass
+
+    def quantized_unavailable(st_cls):
+        raise RuntimeError("no int8 export")
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=FakeModel))
+    monkeypatch.setitem(sys.modules, "spacy", types.SimpleNamespace(load=lambda *a, **k: FakeSpacy()))
+    monkeypatch.setattr(settings, "EMBED_CACHE_PATH", str(tmp_path / "embed_cache.db"))
+    monkeypatch.setattr(settings, "EMBEDDING_QUANTIZE", True)
+    monkeypatch.setattr(nlp, "embed_cache", EmbeddingCache())
+    monkeypatch.setattr(nlp.NlpPipeline, "_load_quantized_model", staticmethod(quantized_unavailable))
+
+    nlp.NlpPipeline().embed("hello")
+
+    assert _cache("int8").get_many(["hello"]) == [None]
+    assert _cache("onnx").get_many(["hello"])[0] is not None
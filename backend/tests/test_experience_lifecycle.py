@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
+import pytest
+
+from app.api.routes import experiences
 from app.api.routes.experiences import (
     _build_user_question_objects,
     _collect_user_questions_for_reprocess,
@@ -53,3 +58,43 @@ def test_compute_search_terms_has_signal() -> None:
 
     assert terms
     assert "design" in terms or "consistency" in terms
+
+
+def test_admin_queue_reads_counts_from_stored_stats(monkeypatch: pytest.MonkeyPatch) -> None:
+    selected: list = []
+
+    class Snapshot:
+        id = "doc-1"
+        _data = {
+            "company": "Example Co",
+            "created_at": datetime(2026, 4, 4, tzinfo=timezone.utc),
+            "stats": {"total_question_count": 5, "user_question_count": 2},
+            "author": {"visibility": "public", "public_label": "Jane D."},
+        }
+
+    class Query:
+        def select(self, fields):
+            selected.extend(fields)
+            return self
+
+        def limit(self, count):
+            return self
+
+        def stream(self):
+            return iter([Snapshot()])
+
+    class FakeDb:
+        def collection(self, name):
+            return Query()
+
+    monkeypatch.setattr(experiences, "db", FakeDb())
+
+    result = experiences.get_admin_moderation_queue(status_filter="all", active="all", limit=50, user={})
+
+    assert "stats" in selected
+    assert "questions" not in selected and "extracted_questions" not in selected
+    row = result["results"][0]
+    assert row["question_count"] == 5
+    assert row["user_question_count"] == 2
+    assert row["contributor_display"] == "Jane D."
+    assert row["created_at"] == "2026-04-04T00:00:00+00:00"
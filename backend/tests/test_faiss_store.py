@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services import faiss_store
+from app.services.faiss_store import FaissStore
+
+DIM = 8
+
+
+def _store(root: Path) -> FaissStore:
+    store = FaissStore(DIM)
+    store.index_path = root / "index.faiss"
+    store.mapping_path = root / "mapping.json"
+    return store
+
+
+def _vectors(count: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(7)
+    matrix = rng.standard_normal((count, DIM)).astype("float32")
+    return list(matrix / np.linalg.norm(matrix, axis=1, keepdims=True))
+
+
+def test_inserts_survive_reload_via_journal(tmp_path: Path) -> None:
+    vectors = _vectors(6)
+    store = _store(tmp_path)
+    store.rebuild(vectors[:3], ["a", "b", "c"])
+    for doc_id, vector in zip(["d", "e", "f"], vectors[3:]):
+        store.add_vector(vector, doc_id)
+
+    reloaded = _store(tmp_path)
+    assert sorted(reloaded.mapping.values()) == ["a", "b", "c", "d", "e", "f"]
+    assert reloaded.search(vectors[4], 1)[0][0] == "e"
+
+
+def test_reembedding_a_doc_keeps_its_id(tmp_path: Path) -> None:
+    vectors = _vectors(3)
+    store = _store(tmp_path)
+    first = store.add_vector(vectors[0], "doc")
+    second = store.add_vector(vectors[1], "doc")
+
+    assert first == second
+    assert list(store.mapping.values()) == ["doc"]
+    assert store.search(vectors[1], 1)[0][0] == "doc"
+
+
+@pytest.mark.skipif(faiss_store.faiss is None, reason="needs native FAISS")
+def test_flat_index_upgrades_to_hnsw_past_threshold(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(faiss_store, "_HNSW_THRESHOLD", 16)
+    vectors = _vectors(20)
+    store = _store(tmp_path)
+    with store.bulk():
+        for i, vector in enumerate(vectors):
+            store.add_vector(vector, f"doc-{i}")
+
+    assert isinstance(faiss_store.faiss.downcast_index(store.index.index), faiss_store.faiss.IndexHNSW)
+    assert store.index.ntotal == 20
+    assert store.search(vectors[11], 1)[0][0] == "doc-11"
+
+
+def test_unnormalized_vectors_are_normalized_on_request(tmp_path: Path) -> None:
+    vector = _vectors(1)[0]
+    store = _store(tmp_path)
+    store.add_vector(vector * 5.0, "doc", assume_normalized=False)
+
+    (doc_id, score), = store.search(vector * 3.0, 1, assume_normalized=False)
+
+    assert doc_id == "doc"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.skipif(faiss_store.faiss is None, reason="needs native FAISS")
+def test_reembedding_into_hnsw_replaces_the_old_vector(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(faiss_store, "_HNSW_THRESHOLD", 16)
+    vectors = _vectors(21)
+    store = _store(tmp_path)
+    with store.bulk():
+        for i, vector in enumerate(vectors[:20]):
+            store.add_vector(vector, f"doc-{i}")
+
+    store.add_vector(vectors[20], "doc-3")
+
+    assert isinstance(faiss_store.faiss.downcast_index(store.index.index), faiss_store.faiss.IndexHNSW)
+    assert store.index.ntotal == 20
+    (doc_id, score), = store.search(vectors[20], 1)
+    assert doc_id == "doc-3" and score == pytest.approx(1.0, abs=1e-5)
+    assert all(
+        not (doc_id == "doc-3" and score == pytest.approx(1.0, abs=1e-5))
+        for doc_id, score in store.search(vectors[3], 20)
+    )
+
+
+def test_concurrent_first_searches_load_the_index_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    vector = _vectors(1)[0]
+    _store(tmp_path).rebuild([vector], ["doc"])
+    store = _store(tmp_path)
+    loads = []
+    load_index = FaissStore._load_or_create_index
+
+    def slow_load(self):
+        loads.append(1)
+        time.sleep(0.05)
+        return load_index(self)
+
+    monkeypatch.setattr(FaissStore, "_load_or_create_index", slow_load)
+    results: list = []
+    threads = [threading.Thread(target=lambda: results.append(store.search(vector, 1))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert [hits[0][0] for hits in results] == ["doc"] * 8
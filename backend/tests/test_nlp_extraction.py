@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services import nlp
+
+
+def test_classify_question_topic_picks_most_specific_topic() -> None:
+    assert nlp._classify_question_topic("Explain deadlock between a process and a thread") == "OS"
+    assert nlp._classify_question_topic("Write SQL to join two tables") == "DBMS"
+    assert nlp._classify_question_topic("Describe your weekend") == "General"
+
+
+def test_keyword_hits_match_plain_substring_scan(monkeypatch: pytest.MonkeyPatch) -> None:
+    texts = [
+        "binary search on a sorted array, then bfs and dfs on a graph",
+        "tcp vs udp, http handshake and dns latency",
+        "tell me about yourself and your team conflict project",
+        "",
+    ]
+    fast = [nlp._topic_keyword_hits(text) for text in texts]
+
+    monkeypatch.setattr(nlp, "_KEYWORD_AUTOMATON", None)
+    slow = [nlp._topic_keyword_hits(text) for text in texts]
+
+    for fast_hits, slow_hits in zip(fast, slow):
+        assert {k: v for k, v in fast_hits.items() if v} == {k: v for k, v in slow_hits.items() if v}
+
+
+def test_line_candidates_match_splitlines_scan() -> None:
+    raw_text = (
+        "Round 1:\r\n"
+        "- Q1: Explain virtual memory and paging\r\n"
+        "• What is a deadlock?  \n"
+        "They asked about normalization in DBMS\x0c"
+        "Some context line without a question\n"
+        "\t-- why is TCP reliable? --\n"
+    )
+    expected = [
+        stripped
+        for stripped in (line.strip("-• \t").strip() for line in raw_text.splitlines())
+        if stripped
+        and not nlp._is_section_header(stripped)
+        and (stripped.endswith("?") or stripped.lower().startswith(nlp.QUESTION_PREFIXES))
+    ]
+
+    candidates = [
+        match.group().strip("-• \t").strip()
+        for match in nlp._LINE_CANDIDATE_RE.finditer(raw_text)
+    ]
+
+    assert [c for c in candidates if not nlp._is_section_header(c)] == expected
+
+
+def test_embed_document_matches_process_embedding(monkeypatch: pytest.MonkeyPatch) -> None:
+    class Span:
+        def __init__(self, text: str) -> None:
+            self.text = text
+
+    class Doc:
+        def __init__(self, text: str) -> None:
+            self.sents = [Span(part + ".") for part in text.split(".") if part.strip()]
+
+    def embed_many(texts, batch_size=32):
+        return np.array([[len(text), text.count("a") + 1.0, 1.0] for text in texts], dtype="float32")
+
+    pipeline = nlp.NlpPipeline()
+    pipeline._model = object()
+    pipeline._nlp = Doc
+    monkeypatch.setattr(pipeline, "embed_many", embed_many)
+    text = "Round 1 was DSA. They asked about arrays. HR was short."
+
+    np.testing.assert_allclose(pipeline.embed_document(text), pipeline.process(text)["embedding"])
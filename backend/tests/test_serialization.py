@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.utils.serialization import _convert_value, project_snapshot, serialize_data
+
+
+def _experience(**overrides) -> dict:
+    created = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+    data = {
+        "created_by": "uid-1",
+        "company": "Example Co",
+        "raw_text": "Round 1 was DSA.",
+        "created_at": created,
+        "extracted_questions": [
+            {"question_text": "What is a heap?", "source": "ai", "created_at": created},
+            {"question_text": "Why this company?", "source": "user"},
+        ],
+        "author": {"visibility": "anonymous", "public_label": ""},
+    }
+    data.update(overrides)
+    return data
+
+
+def test_serialize_data_matches_python_conversion() -> None:
+    data = _experience()
+    expected = _convert_value(dict(data, id="doc-1"))
+
+    result = serialize_data(data, "doc-1", include_private=True)
+
+    assert result["created_at"] == "2024-05-01T09:30:00+00:00"
+    assert result["extracted_questions"] == expected["extracted_questions"]
+    assert result["stats"] == {
+        "user_question_count": 1,
+        "extracted_question_count": 1,
+        "total_question_count": 2,
+    }
+
+
+def test_unencodable_values_pass_through() -> None:
+    marker = object()
+
+    result = serialize_data(_experience(location=marker), "doc-1", include_private=True)
+
+    assert result["location"] is marker
+    assert result["created_at"] == "2024-05-01T09:30:00+00:00"
+
+
+def test_contributor_display_honours_anonymity_contract() -> None:
+    def display(**fields) -> str:
+        return serialize_data(_experience(**fields), "doc-1", include_contributor=True)["contributor_display"]
+
+    assert display() == "Anonymous"
+    assert display(author={"visibility": "public", "public_label": "  Jane D. "}) == "Jane D."
+    assert display(author={"visibility": "public", "public_label": None}) == "Anonymous"
+    assert display(author={"visibility": "public", "public_label": "Jane D."}, is_anonymous=True) == "Anonymous"
+    assert display(author=None, is_anonymous=False, show_name=True, contributor_name="jane doe") == "jane D."
+    assert display(author=None, is_anonymous=False, show_name=False, contributor_name="jane doe") == "Anonymous"
+
+
+def test_convert_value_copies_only_containers_holding_datetimes() -> None:
+    untouched = {"topics": ["DSA", "OS"], "stats": {"total_question_count": 2}}
+    mixed = {"plain": ["a"], "when": [datetime(2024, 1, 1)]}
+
+    converted = _convert_value(mixed)
+
+    assert _convert_value(untouched) is untouched
+    assert converted is not mixed
+    assert converted["plain"] is mixed["plain"]
+    assert converted["when"] == ["2024-01-01T00:00:00"]
+
+
+def test_isoformat_cache_keeps_equal_instants_in_their_own_zone() -> None:
+    utc = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    ist = utc.astimezone(timezone(timedelta(hours=5, minutes=30)))
+
+    assert _convert_value([utc, ist]) == ["2024-01-01T12:00:00+00:00", "2024-01-01T17:30:00+05:30"]
+
+
+def test_project_snapshot_reads_only_requested_fields() -> None:
+    class Snapshot:
+        id = "doc-1"
+        _data = {"company": "Example Co", "raw_text": "long", "stats": {"total_question_count": 3}}
+
+        def to_dict(self) -> dict:
+            raise AssertionError("projection must not deep-copy the document")
+
+    assert project_snapshot(Snapshot(), frozenset({"company", "stats", "missing"})) == {
+        "company": "Example Co",
+        "stats": {"total_question_count": 3},
+    }
+
+
+def test_stored_contributor_display_wins_over_derivation() -> None:
+    data = _experience(contributor_display="Jane D.")
+
+    assert serialize_data(data, "doc-1", include_contributor=True)["contributor_display"] == "Jane D."
+
+
+def test_stored_question_fields_are_returned_as_is() -> None:
+    questions = {"user_provided": [], "ai_extracted": []}
+    stats = {"user_question_count": 0, "extracted_question_count": 5, "total_question_count": 5}
+
+    result = serialize_data(_experience(questions=questions, stats=stats), "doc-1", include_private=True)
+
+    assert result["questions"] == questions
+    assert result["stats"] == stats
+
+
+def test_orjson_path_formats_datetimes_like_isoformat() -> None:
+    odd_offset = datetime(2024, 1, 1, tzinfo=timezone(timedelta(seconds=30)))
+
+    assert serialize_data(_experience(history=[odd_offset]), "doc-1")["history"] == [odd_offset.isoformat()]
+
+
+def test_owned_data_is_converted_in_place() -> None:
+    data = _experience(is_anonymous=False, show_name=True, contributor_name="jane doe", author=None)
+
+    result = serialize_data(data, "doc-1", include_contributor=True, owned=True)
+
+    assert result is data
+    assert result["created_at"] == "2024-05-01T09:30:00+00:00"
+    assert result["contributor_name"] is None
+    assert result["contributor_display"] == "jane D."
+
+
+def test_legacy_integer_embedding_id_is_returned_as_string() -> None:
+    embedding_id = -(2**62) + 1
+
+    result = serialize_data(_experience(embedding_id=embedding_id), "doc-1", include_private=True)
+
+    assert result["embedding_id"] == str(embedding_id)
+
+
+def test_nested_non_finite_floats_survive_conversion() -> None:
+    scores = {"confidence": float("nan"), "bounds": [float("inf"), None, 0.5], "at": datetime(2024, 1, 1)}
+
+    result = serialize_data(_experience(scores=scores), "doc-1", include_private=True)["scores"]
+
+    assert math.isnan(result["confidence"])
+    assert result["bounds"] == [float("inf"), None, 0.5]
+    assert result["at"] == "2024-01-01T00:00:00"
@@ -50,7 +50,7 @@ export type Experience = {
   topics: string[];
   summary: string;
   stats?: QuestionStats;
-  embedding_id?: number;
+  embedding_id?: string;
   created_by: string;
   contributor_name?: string;
   contributor_display?: string;